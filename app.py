@@ -1,47 +1,173 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import logging
+import atexit
+import queue
 import uuid
 import shutil
-import json
+import tempfile
+import functools
+import sqlite3
+import heapq
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for
+from logging.handlers import QueueHandler, QueueListener
+from flask import Flask, Request, abort, render_template, request, jsonify, send_from_directory, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
+import orjson
+import PIL
 
 import dobble_math
 import card_generator
 import image_processor
 
-# Set up logging
+# Set up logging. Records are formatted by the queue handler and written to
+# the log file and stderr by a listener thread, keeping disk writes off the
+# request path.
+log_handler = QueueHandler(queue.SimpleQueue())
 logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('/app/logs/app.log'), logging.StreamHandler()]
+    handlers=[log_handler]
 )
+
+
+def start_log_listener():
+    """
+    Start a listener thread for the log records of this process.
+
+    Threads do not survive a fork, so gunicorn workers call this again once
+    they are forked (see gunicorn.conf.py), with a queue of their own.
+    """
+    log_handler.queue = queue.SimpleQueue()
+    log_listener = QueueListener(log_handler.queue, logging.FileHandler('/app/logs/app.log'), logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+
+start_log_listener()
 logger = logging.getLogger('dobble_generator')
 
+# Pillow-SIMD builds carry a .postN version suffix
+logger.info(f"Using {'Pillow-SIMD' if '.post' in PIL.__version__ else 'Pillow'} {PIL.__version__}")
+
 # App constants
 UPLOAD_FOLDER = '/app/uploads'
 ICONS_FOLDER = os.path.join(UPLOAD_FOLDER, 'icons')
 EXPORTS_FOLDER = os.path.join(UPLOAD_FOLDER, 'exports')
+CACHE_FOLDER = os.path.join(UPLOAD_FOLDER, 'cache')
+# Kept out of EXPORTS_FOLDER, which is served publicly
+EXPORTS_DB_PATH = os.path.join(UPLOAD_FOLDER, 'exports.db')
 DEFAULT_ICONS_FOLDER = '/app/static/default_icons'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'svg'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'svg'})
+UPLOAD_BUFFER_SIZE = 64 * 1024
+# Names secure_filename would return unchanged: safe characters only, with
+# no leading or trailing dots or underscores
+SAFE_FILENAME_RE = re.compile(r'[A-Za-z0-9-](?:[A-Za-z0-9_.-]*[A-Za-z0-9-])?')
+MAX_SYMBOLS_PER_CARD = 12
+MAX_SYMBOLS = 133  # symbols needed for 12 symbols per card
+EXPORT_MAX_AGE = 60 * 60  # exports never change once written
+ALLOWED_FILE_RE = re.compile(
+    r'\.(?:%s)\Z' % '|'.join(map(re.escape, sorted(ALLOWED_EXTENSIONS))), re.IGNORECASE
+)
+EXPORT_FILE_RE = re.compile(r'\.(?:pdf|png)\Z')
+
+# Temporary files are created readable by their owner only; files moved into
+# place from them get the mode open() would have given them under the umask
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+# Scan caches, keyed by path and holding (mtime_ns, data) tuples. Job data is
+# kept for the most recently loaded JOB_DATA_CACHE_SIZE exports only
+JOB_DATA_CACHE_SIZE = 256
+_icon_set_cache = {}
+_job_data_cache = OrderedDict()
+_job_data_lock = threading.Lock()
+
+# Shared pool for decoding and resizing icons; Pillow releases the GIL for
+# the heavy parts, so threads scale across cores without pickling images
+icon_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='icons')
 
 # Ensure directories exist
 os.makedirs(ICONS_FOLDER, exist_ok=True)
 os.makedirs(EXPORTS_FOLDER, exist_ok=True)
 
+
+
+class UploadRequest(Request):
+    """
+    Request that streams uploaded files straight to disk.
+
+    Each file part is written through a 64 KB buffer into a staging file in
+    the icons folder, so the upload handler can move it into its set with a
+    rename instead of copying it again. Staged files that were not moved are
+    removed when the request is closed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.staged_uploads = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        staged = tempfile.NamedTemporaryFile(
+            'w+b', buffering=UPLOAD_BUFFER_SIZE, dir=ICONS_FOLDER, prefix='.upload-', delete=False
+        )
+        self.staged_uploads.append(staged.name)
+        os.fchmod(staged.fileno(), FILE_MODE)
+        return staged
+
+    def close(self):
+        super().close()
+        for path in self.staged_uploads:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson, writing response bodies as bytes."""
+
+    def _option(self):
+        return orjson.OPT_SORT_KEYS if self.sort_keys else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._option())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = UploadRequest
+app.json = OrjsonProvider(app)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 
 
+def safe_filename(filename):
+    """Sanitize a filename, skipping secure_filename for names that are already safe."""
+    if SAFE_FILENAME_RE.fullmatch(filename):
+        return filename
+    return secure_filename(filename)
+
+
 def allowed_file(filename):
     """Check if the file extension is allowed."""
-    return '.' in filename and \
-        filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return ALLOWED_FILE_RE.search(filename) is not None
 
 
 @app.route('/')
@@ -75,17 +201,20 @@ def preview(job_id):
     """Render the preview page for a specific job."""
     job_data_path = os.path.join(EXPORTS_FOLDER, f"{job_id}.json")
 
-    if not os.path.exists(job_data_path):
-        return redirect(url_for('index'))
-
     try:
-        with open(job_data_path, 'r') as f:
-            job_data = json.load(f)
+        job_data = load_job_data(job_data_path)
+    except FileNotFoundError:
+        return redirect(url_for('index'))
     except Exception as e:
         logger.error(f"Error loading job data: {e}")
         return redirect(url_for('index'))
 
-    return render_template('preview.html', job=job_data)
+    png_urls = [
+        url_for('serve_export', filename=os.path.relpath(png_path, EXPORTS_FOLDER))
+        for png_path in get_job_png_paths(job_data)
+    ]
+
+    return render_template('preview.html', job=job_data, png_urls=png_urls)
 
 
 @app.route('/api/generate', methods=['POST'])
@@ -93,14 +222,30 @@ def generate_cards():
     """Generate Dobble cards based on the request parameters."""
     try:
         # Get parameters from the request
-        n_symbols = int(request.form.get('n_symbols', 31))  # Default: minimum for 7 symbols per card
-        n_cards = int(request.form.get('n_cards', 0))  # 0 means maximum possible
-        symbols_per_card = int(request.form.get('symbols_per_card', 0))  # 0 means auto-calculate
+        try:
+            n_symbols = int(request.form.get('n_symbols', 31))  # Default: minimum for 7 symbols per card
+            n_cards = int(request.form.get('n_cards', 0))  # 0 means maximum possible
+            symbols_per_card = int(request.form.get('symbols_per_card', 0))  # 0 means auto-calculate
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid numeric parameter'}), 400
         icon_set = request.form.get('icon_set', '')
         card_size = request.form.get('card_size', 'A4')  # A4, A5, etc.
         layout = request.form.get('layout', 'smart')
         download_format = request.form.get('format', 'pdf')  # pdf, png, both
 
+        # Validate everything before touching the filesystem
+        if not 1 <= n_symbols <= MAX_SYMBOLS:
+            return jsonify({'success': False, 'message': f'Number of symbols must be between 1 and {MAX_SYMBOLS}'}), 400
+
+        if n_cards < 0:
+            return jsonify({'success': False, 'message': 'Number of cards cannot be negative'}), 400
+
+        if symbols_per_card and not 3 <= symbols_per_card <= MAX_SYMBOLS_PER_CARD:
+            return jsonify({
+                'success': False,
+                'message': f'Symbols per card must be between 3 and {MAX_SYMBOLS_PER_CARD}'
+            }), 400
+
         # Check if icon set is specified
         if not icon_set:
             return jsonify({'success': False, 'message': 'No icon set specified'}), 400
@@ -111,21 +256,25 @@ def generate_cards():
             return jsonify({'success': False, 'message': 'Invalid icon set format'}), 400
 
         icon_set_type, icon_set_id = icon_set_parts
+        if icon_set_type not in ('default', 'user') or not is_valid_set_id(icon_set_id):
+            return jsonify({'success': False, 'message': 'Invalid icon set format'}), 400
 
         # Get the icon files based on the type
         if icon_set_type == 'default':
             icon_dir = os.path.join(DEFAULT_ICONS_FOLDER, icon_set_id)
-        else:  # user
+        else:
             icon_dir = os.path.join(ICONS_FOLDER, icon_set_id)
+        cache_dir = icon_cache_dir(icon_set_type, icon_set_id)
 
-        if not os.path.exists(icon_dir):
+        if not os.path.isdir(icon_dir):
             return jsonify({'success': False, 'message': 'Icon set not found'}), 404
 
         # Get all image files from the icon directory
         icon_files = []
-        for filename in os.listdir(icon_dir):
-            if allowed_file(filename):
-                icon_files.append(os.path.join(icon_dir, filename))
+        with os.scandir(icon_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and allowed_file(entry.name):
+                    icon_files.append(entry.path)
 
         available_symbols = len(icon_files)
         if available_symbols == 0:
@@ -152,25 +301,31 @@ def generate_cards():
             cards = dobble_math.limit_cards(cards, n_cards)
 
         # Map card symbols to actual icons
-        symbol_to_icon = dobble_math.select_symbols(cards, available_symbols)
+        symbol_to_icon = dobble_math.select_symbols(total_symbols_needed, available_symbols)
 
-        # Now map the symbols to actual icon files
+        # Now map the symbols to actual icon files; a full deck has as many
+        # cards as symbols, so a smaller one may have dropped some symbols
+        if len(cards) < total_symbols_needed:
+            used_symbols = set().union(*cards)
+            symbol_to_icon = {symbol: symbol_to_icon[symbol] for symbol in used_symbols}
         symbol_to_file = {symbol: icon_files[icon_idx] for symbol, icon_idx in symbol_to_icon.items()}
 
         # Generate a job ID
         job_id = str(uuid.uuid4())
 
         # Prepare the icon images
-        processed_icons = image_processor.process_icons(symbol_to_file)
+        processed_icons = image_processor.process_icons(symbol_to_file, executor=icon_pool, cache_dir=cache_dir)
 
-        # Generate the card layout
+        # Generate the card layout, with the PNGs in a directory of their own
+        png_dir = os.path.join(EXPORTS_FOLDER, job_id)
         pdf_path, png_paths = card_generator.generate_cards(
             job_id,
             cards,
             processed_icons,
             EXPORTS_FOLDER,
             card_size=card_size,
-            layout=layout
+            layout=layout,
+            png_dir=png_dir
         )
 
         # Save job information for later reference
@@ -184,12 +339,12 @@ def generate_cards():
             'card_size': card_size,
             'layout': layout,
             'pdf_path': pdf_path,
-            'png_paths': png_paths,
+            'png_dir': png_dir if png_paths else '',
             'download_format': download_format
         }
 
-        with open(os.path.join(EXPORTS_FOLDER, f"{job_id}.json"), 'w') as f:
-            json.dump(job_data, f)
+        write_json(os.path.join(EXPORTS_FOLDER, f"{job_id}.json"), job_data)
+        index_export(job_data)
 
         # Return success with job ID
         return jsonify({
@@ -214,7 +369,7 @@ def upload_icons():
             return jsonify({'success': False, 'message': 'Set name is required'}), 400
 
         # Create a clean set ID from the name
-        set_id = secure_filename(set_name).lower()
+        set_id = safe_filename(set_name).lower()
         if not set_id:
             set_id = str(uuid.uuid4())
 
@@ -230,22 +385,26 @@ def upload_icons():
         if not files or files[0].filename == '':
             return jsonify({'success': False, 'message': 'No files selected'}), 400
 
-        # Process each uploaded file
+        # Move each staged upload into the set; rejected files are dropped on close
         count = 0
         for file in files:
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(icon_set_dir, filename))
+                filename = safe_filename(file.filename)
+                file.stream.flush()
+                os.replace(file.stream.name, os.path.join(icon_set_dir, filename))
                 count += 1
 
         # Save set metadata
-        with open(os.path.join(icon_set_dir, 'metadata.json'), 'w') as f:
-            json.dump({
-                'id': set_id,
-                'name': set_name,
-                'count': count,
-                'created_at': datetime.now().isoformat()
-            }, f)
+        write_json(os.path.join(icon_set_dir, 'metadata.json'), {
+            'id': set_id,
+            'name': set_name,
+            'count': count,
+            'created_at': datetime.now().isoformat()
+        })
+
+        # Make sure the next listing rescans this set and its icons are reprocessed
+        _icon_set_cache.pop(icon_set_dir, None)
+        shutil.rmtree(icon_cache_dir('user', set_id), ignore_errors=True)
 
         return jsonify({
             'success': True,
@@ -273,6 +432,9 @@ def delete_icon_set():
             return jsonify({'success': False, 'message': 'Cannot delete default icon sets'}), 400
 
         icon_set_id = icon_set_parts[1]
+        if not is_valid_set_id(icon_set_id):
+            return jsonify({'success': False, 'message': 'Invalid icon set format'}), 400
+
         icon_set_dir = os.path.join(ICONS_FOLDER, icon_set_id)
 
         # Check if the directory exists
@@ -281,6 +443,8 @@ def delete_icon_set():
 
         # Delete the directory and all its contents
         shutil.rmtree(icon_set_dir)
+        _icon_set_cache.pop(icon_set_dir, None)
+        shutil.rmtree(icon_cache_dir('user', icon_set_id), ignore_errors=True)
 
         return jsonify({
             'success': True,
@@ -301,28 +465,30 @@ def delete_export():
         if not job_id:
             return jsonify({'success': False, 'message': 'No job ID specified'}), 400
 
-        # Check if the job exists
+        # Load job data to get associated files
         job_data_path = os.path.join(EXPORTS_FOLDER, f"{job_id}.json")
-        if not os.path.exists(job_data_path):
+        try:
+            job_data = load_job_data(job_data_path)
+        except FileNotFoundError:
             return jsonify({'success': False, 'message': 'Export not found'}), 404
 
-        # Load job data to get associated files
-        with open(job_data_path, 'r') as f:
-            job_data = json.load(f)
-
         # Delete PDF file
         pdf_path = job_data.get('pdf_path', '')
         if pdf_path and os.path.exists(pdf_path):
             os.remove(pdf_path)
 
         # Delete PNG files
-        png_paths = job_data.get('png_paths', [])
-        for png_path in png_paths:
+        if job_data.get('png_dir'):
+            shutil.rmtree(job_data['png_dir'], ignore_errors=True)
+        for png_path in job_data.get('png_paths', []):
             if os.path.exists(png_path):
                 os.remove(png_path)
 
         # Delete job data file
         os.remove(job_data_path)
+        with _job_data_lock:
+            _job_data_cache.pop(job_data_path, None)
+        unindex_export(job_id)
 
         return jsonify({
             'success': True,
@@ -334,10 +500,17 @@ def delete_export():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
-@app.route('/exports/<filename>')
+@app.route('/exports/<path:filename>')
 def serve_export(filename):
     """Serve an exported file."""
-    return send_from_directory(EXPORTS_FOLDER, filename)
+    # Only the generated PDFs and PNGs are downloads; job data and anything
+    # else in the folder is not
+    if not EXPORT_FILE_RE.search(filename):
+        abort(404)
+
+    # Conditional responses let browsers revalidate with a 304, and the file
+    # body is handed to the server's file wrapper (sendfile under gunicorn)
+    return send_from_directory(EXPORTS_FOLDER, filename, conditional=True, etag=True, max_age=EXPORT_MAX_AGE)
 
 
 @app.route('/health')
@@ -349,92 +522,93 @@ def health_check():
     })
 
 
+@functools.cache
 def get_default_icon_sets():
-    """Get information about available default icon sets."""
-    icon_sets = []
-
-    # Check if default icons directory exists
-    if not os.path.exists(DEFAULT_ICONS_FOLDER):
-        return icon_sets
-
-    # Iterate through each subdirectory
-    for set_id in os.listdir(DEFAULT_ICONS_FOLDER):
-        set_dir = os.path.join(DEFAULT_ICONS_FOLDER, set_id)
-        if os.path.isdir(set_dir):
-            # Count valid icon files
-            count = 0
-            sample_icon = None
-            for filename in os.listdir(set_dir):
-                if allowed_file(filename):
-                    count += 1
-                    if not sample_icon:
-                        sample_icon = f"/static/default_icons/{set_id}/{filename}"
-
-            # Load metadata if available
-            metadata_path = os.path.join(set_dir, 'metadata.json')
-            if os.path.exists(metadata_path):
-                try:
-                    with open(metadata_path, 'r') as f:
-                        metadata = json.load(f)
-                    set_name = metadata.get('name', set_id)
-                except Exception:
-                    set_name = set_id.replace('_', ' ').title()
-            else:
-                set_name = set_id.replace('_', ' ').title()
-
-            icon_sets.append({
-                'id': f"default:{set_id}",
-                'name': set_name,
-                'count': count,
-                'sample_icon': sample_icon
-            })
+    """
+    Get information about available default icon sets.
 
-    return icon_sets
+    The default sets ship read-only with the image, so they are only scanned once.
+    """
+    return list_icon_sets(DEFAULT_ICONS_FOLDER, 'default', '/static/default_icons')
 
 
 def get_user_icon_sets():
     """Get information about user-uploaded icon sets."""
+    return list_icon_sets(ICONS_FOLDER, 'user', '/uploads/icons')
+
+
+def is_valid_set_id(set_id):
+    """Check that an icon set ID names a single directory entry."""
+    return set_id not in ('', os.curdir, os.pardir) and os.path.basename(set_id) == set_id
+
+
+def icon_cache_dir(set_type, set_id):
+    """Get the directory holding the processed icons of an icon set."""
+    return os.path.join(CACHE_FOLDER, set_type, set_id)
+
+
+def list_icon_sets(root_dir, set_type, url_prefix):
+    """Get information about the icon sets stored under root_dir."""
     icon_sets = []
 
-    # Check if user icons directory exists
-    if not os.path.exists(ICONS_FOLDER):
+    # Check if the icon sets directory exists
+    if not os.path.exists(root_dir):
         return icon_sets
 
     # Iterate through each subdirectory
-    for set_id in os.listdir(ICONS_FOLDER):
-        set_dir = os.path.join(ICONS_FOLDER, set_id)
-        if os.path.isdir(set_dir):
-            # Count valid icon files
-            count = 0
-            sample_icon = None
-            for filename in os.listdir(set_dir):
-                if allowed_file(filename):
-                    count += 1
-                    if not sample_icon:
-                        sample_icon = f"/uploads/icons/{set_id}/{filename}"
-
-            # Load metadata if available
-            metadata_path = os.path.join(set_dir, 'metadata.json')
-            if os.path.exists(metadata_path):
-                try:
-                    with open(metadata_path, 'r') as f:
-                        metadata = json.load(f)
-                    set_name = metadata.get('name', set_id)
-                except Exception:
-                    set_name = set_id.replace('_', ' ').title()
-            else:
-                set_name = set_id.replace('_', ' ').title()
-
-            icon_sets.append({
-                'id': f"user:{set_id}",
-                'name': set_name,
-                'count': count,
-                'sample_icon': sample_icon
-            })
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                set_info = scan_icon_set(entry.path, entry.name, url_prefix)
+                icon_sets.append({'id': f"{set_type}:{entry.name}", **set_info})
 
     return icon_sets
 
 
+def scan_icon_set(set_dir, set_id, url_prefix):
+    """
+    Count the icons in a set and load its name.
+
+    The result is cached against the directory's mtime, so an unchanged set
+    costs a single stat call instead of a listing plus a metadata parse.
+    """
+    mtime = os.stat(set_dir).st_mtime_ns
+    cached = _icon_set_cache.get(set_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    # Count valid icon files
+    count = 0
+    sample_icon = None
+    with os.scandir(set_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and allowed_file(entry.name):
+                count += 1
+                if not sample_icon:
+                    sample_icon = f"{url_prefix}/{set_id}/{entry.name}"
+
+    # Load metadata if available
+    metadata_path = os.path.join(set_dir, 'metadata.json')
+    if os.path.exists(metadata_path):
+        try:
+            with open(metadata_path, 'rb') as f:
+                metadata = orjson.loads(f.read())
+            set_name = metadata.get('name', set_id)
+        except Exception:
+            set_name = set_id.replace('_', ' ').title()
+    else:
+        set_name = set_id.replace('_', ' ').title()
+
+    set_info = {
+        'name': set_name,
+        'count': count,
+        'sample_icon': sample_icon
+    }
+    _icon_set_cache[set_dir] = (mtime, set_info)
+
+    return set_info
+
+
 def get_recent_exports(limit=5):
     """Get information about recent exports."""
     exports = []
@@ -443,40 +617,195 @@ def get_recent_exports(limit=5):
     if not os.path.exists(EXPORTS_FOLDER):
         return exports
 
-    # Get all JSON files with job data
-    json_files = []
-    for filename in os.listdir(EXPORTS_FOLDER):
-        if filename.endswith('.json'):
-            json_path = os.path.join(EXPORTS_FOLDER, filename)
-            try:
-                with open(json_path, 'r') as f:
-                    job_data = json.load(f)
-                job_data['created_at_dt'] = datetime.fromisoformat(job_data['created_at'])
-                json_files.append(job_data)
-            except Exception as e:
-                logger.error(f"Error loading job data from {json_path}: {e}")
-
-    # Sort by creation time, newest first
-    json_files.sort(key=lambda x: x['created_at_dt'], reverse=True)
-
-    # Get the most recent ones
-    for job in json_files[:limit]:
-        # Check if PDF file exists
-        pdf_exists = os.path.exists(job.get('pdf_path', ''))
-
+    # Look up the most recent jobs in the index, falling back to a directory scan
+    try:
+        with closing(connect_exports_db()) as conn:
+            rows = conn.execute(
+                "SELECT id, strftime('%Y-%m-%d %H:%M', created_at), n_cards, symbols_per_card, pdf_path "
+                "FROM exports ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error reading exports index: {e}")
+        jobs = scan_recent_exports(limit)
+        jobs.sort(key=lambda x: x['created_at_dt'], reverse=True)
+        rows = [(
+            job['id'],
+            job['created_at_dt'].strftime('%Y-%m-%d %H:%M'),
+            job.get('n_cards', 0),
+            job.get('symbols_per_card', 0),
+            job.get('pdf_path', '')
+        ) for job in jobs]
+
+    # Build the listing entries
+    for job_id, created_at, n_cards, symbols_per_card, pdf_path in rows:
         exports.append({
-            'id': job['id'],
-            'created_at': job['created_at_dt'].strftime('%Y-%m-%d %H:%M'),
-            'n_cards': job.get('n_cards', 0),
-            'symbols_per_card': job.get('symbols_per_card', 0),
-            'pdf_path': os.path.basename(job.get('pdf_path', '')),
-            'pdf_exists': pdf_exists,
-            'preview_url': url_for('preview', job_id=job['id'])
+            'id': job_id,
+            'created_at': created_at,
+            'n_cards': n_cards,
+            'symbols_per_card': symbols_per_card,
+            'pdf_path': os.path.basename(pdf_path),
+            'pdf_exists': os.path.exists(pdf_path),
+            'preview_url': url_for('preview', job_id=job_id)
         })
 
     return exports
 
 
+def scan_exports():
+    """Load the job data of every export in the exports folder."""
+    jobs = []
+    with os.scandir(EXPORTS_FOLDER) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json'):
+                try:
+                    jobs.append(load_job_data(entry.path))
+                except Exception as e:
+                    logger.error(f"Error loading job data from {entry.path}: {e}")
+
+    return jobs
+
+
+def scan_recent_exports(limit):
+    """
+    Load the job data of the most recently written exports, with their
+    parsed creation times as `created_at_dt`.
+
+    Job files are ranked by mtime first, so only the top `limit` are parsed.
+    """
+    with os.scandir(EXPORTS_FOLDER) as entries:
+        json_entries = [(entry.stat().st_mtime_ns, entry.path) for entry in entries if entry.name.endswith('.json')]
+
+    jobs = []
+    for _, json_path in heapq.nlargest(limit, json_entries):
+        try:
+            job_data = load_job_data(json_path)
+            # The listing is sorted on the creation time, so parse it here
+            created_at_dt = datetime.fromisoformat(job_data.get('created_at', ''))
+        except Exception as e:
+            logger.error(f"Error loading job data from {json_path}: {e}")
+            continue
+        jobs.append(dict(job_data, created_at_dt=created_at_dt))
+
+    return jobs
+
+
+def connect_exports_db():
+    """
+    Open the SQLite index of exports.
+
+    The index is created on first use and backfilled from the job JSON files
+    already in the exports folder, which remain the source of truth.
+    """
+    conn = sqlite3.connect(EXPORTS_DB_PATH, timeout=10)
+    if conn.execute('PRAGMA user_version').fetchone()[0] == 0:
+        conn.execute('PRAGMA journal_mode = WAL')
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS exports ('
+                'id TEXT PRIMARY KEY, created_at TEXT NOT NULL, n_cards INTEGER, '
+                'symbols_per_card INTEGER, pdf_path TEXT)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_exports_created_at ON exports (created_at DESC)')
+            conn.executemany(
+                'INSERT OR REPLACE INTO exports VALUES (?, ?, ?, ?, ?)',
+                # Jobs without a creation time cannot be listed, so they are not indexed
+                [export_row(job) for job in scan_exports() if job.get('created_at')]
+            )
+            conn.execute('PRAGMA user_version = 1')
+
+    return conn
+
+
+def export_row(job_data):
+    """Build the exports index row for a job."""
+    return (
+        job_data['id'],
+        job_data['created_at'],
+        job_data.get('n_cards', 0),
+        job_data.get('symbols_per_card', 0),
+        job_data.get('pdf_path', '')
+    )
+
+
+def index_export(job_data):
+    """Add a job to the exports index."""
+    try:
+        with closing(connect_exports_db()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO exports VALUES (?, ?, ?, ?, ?)', export_row(job_data))
+    except sqlite3.Error as e:
+        logger.error(f"Error indexing export {job_data['id']}: {e}")
+
+
+def unindex_export(job_id):
+    """Remove a job from the exports index."""
+    try:
+        with closing(connect_exports_db()) as conn, conn:
+            conn.execute('DELETE FROM exports WHERE id = ?', (job_id,))
+    except sqlite3.Error as e:
+        logger.error(f"Error removing export {job_id} from index: {e}")
+
+
+def get_job_png_paths(job_data):
+    """Get the paths of a job's PNG exports, in card order."""
+    png_dir = job_data.get('png_dir')
+    if not png_dir:
+        # Jobs from before PNGs got their own directory list them explicitly
+        return job_data.get('png_paths', [])
+
+    try:
+        with os.scandir(png_dir) as entries:
+            names = [entry.name for entry in entries if entry.name.endswith('.png')]
+    except FileNotFoundError:
+        return []
+
+    # Names only differ in the card number, so shorter names come first
+    names.sort(key=lambda name: (len(name), name))
+    return [os.path.join(png_dir, name) for name in names]
+
+
+def write_json(path, data):
+    """
+    Write data to a JSON file atomically.
+
+    The data is written to a temporary file in the same directory and renamed
+    over the target, so readers never see a partially written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        os.fchmod(fd, FILE_MODE)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(data))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def load_job_data(json_path):
+    """
+    Load the JSON data of an export job.
+
+    Parsed data is cached against the file's mtime, so recently used exports
+    are only parsed once for as long as they are unchanged.
+    """
+    mtime = os.stat(json_path).st_mtime_ns
+    with _job_data_lock:
+        cached = _job_data_cache.get(json_path)
+        if cached and cached[0] == mtime:
+            _job_data_cache.move_to_end(json_path)
+            return cached[1]
+
+    with open(json_path, 'rb') as f:
+        job_data = orjson.loads(f.read())
+    with _job_data_lock:
+        _job_data_cache[json_path] = (mtime, job_data)
+        _job_data_cache.move_to_end(json_path)
+        while len(_job_data_cache) > JOB_DATA_CACHE_SIZE:
+            _job_data_cache.popitem(last=False)
+
+    return job_data
+
+
 @app.route('/api/icons/<path:filename>')
 def serve_icon(filename):
     """Serve a user-uploaded icon."""
@@ -484,4 +813,5 @@ def serve_icon(filename):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8920, debug=True)
\ No newline at end of file
+    # Development server only; the container runs the app under gunicorn
+    app.run(host='0.0.0.0', port=8920, debug=os.environ.get('FLASK_DEBUG') == '1')
\ No newline at end of file
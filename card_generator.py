@@ -3,18 +3,48 @@
 import os
 import logging
 import math
-import random
-from typing import List, Dict, Tuple, Optional
-from PIL import Image, ImageDraw, ImageFont
-import cairo
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import repeat
+from typing import List, Dict, Tuple, Optional, Union, Iterator
+import numpy as np
+from PIL import Image, ImageDraw, ImageChops
 from reportlab.lib.pagesizes import A4, A5, A6, LETTER
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
-from PIL import Image, ImageDraw, ImageFont, ImageChops
+from reportlab import rl_config
 
 # Set up logging
 logger = logging.getLogger('dobble_generator')
 
+# Store PDF streams as compressed binary. ReportLab otherwise also encodes
+# them as ASCII85 in pure Python, which takes about half of the PDF time
+rl_config.useA85 = 0
+
+# Card resolutions: symbols are embedded in the PDF at the size they have on a
+# PDF_CARD_PIXELS render, and PNGs are exported at PNG_CARD_PIXELS
+PDF_CARD_PIXELS = (1000, 1000)
+PNG_CARD_PIXELS = (800, 800)
+
+# Rotations are snapped to multiples of this many degrees so they can be reused
+ROTATION_STEP = 5
+
+# Placement of a symbol on a card: (symbol, x_offset, y_offset, scale, rotation)
+Placement = Tuple[int, float, float, float, float]
+
+# Seed for the layout jitter: an int, a NumPy generator to draw from, or None
+Seed = Union[int, np.random.Generator, None]
+
+# Decks rendered at the same time by one server process. Further requests
+# wait for a slot, so their symbols are not all held in memory at once
+MAX_CONCURRENT_RENDERS = 2
+
+# Render pool of this process, started by the first deck that needs it
+_render_pool: Optional[ThreadPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+_render_slots = threading.BoundedSemaphore(MAX_CONCURRENT_RENDERS)
+
 # Card size constants
 CARD_SIZES = {
     'A4': A4,
@@ -77,13 +107,17 @@ CIRCULAR_LAYOUTS = {
     ],
 }
 
-def generate_circular_layout(n_symbols: int) -> List[Tuple[float, float, float]]:
+
+@functools.lru_cache(maxsize=32)
+def generate_circular_layout(n_symbols: int) -> Tuple[Tuple[float, float, float], ...]:
     """
     Generate a circular layout for the given number of symbols.
-    Returns a list of (x_offset, y_offset, scale) tuples.
+    Returns a tuple of (x_offset, y_offset, scale) tuples.
+
+    Layouts only depend on n_symbols, so each one is computed once.
     """
     if n_symbols in CIRCULAR_LAYOUTS:
-        return CIRCULAR_LAYOUTS[n_symbols]
+        return tuple(CIRCULAR_LAYOUTS[n_symbols])
 
     # For other numbers, generate a circular layout
     layout = []
@@ -97,27 +131,28 @@ def generate_circular_layout(n_symbols: int) -> List[Tuple[float, float, float]]
 
     # Place remaining symbols in a circle
     radius = 0.28  # Reduced radius to keep symbols further from edge
-    angle_step = 2 * math.pi / remaining
-    
+    angles = np.arange(remaining) * (2 * math.pi / remaining)
+
     # Scale based on number of symbols
     if remaining <= 6:
         scale = 0.22
     else:
         scale = 0.20  # Smaller for more symbols
-    
-    for i in range(remaining):
-        angle = i * angle_step
-        x = 0.5 + radius * math.cos(angle)
-        y = 0.5 + radius * math.sin(angle)
-        layout.append((x, y, scale))
 
-    return layout
+    xs = 0.5 + radius * np.cos(angles)
+    ys = 0.5 + radius * np.sin(angles)
+    layout.extend(zip(xs.tolist(), ys.tolist(), [scale] * remaining))
+
+    return tuple(layout)
 
-def generate_grid_layout(n_symbols: int) -> List[Tuple[float, float, float]]:
 
+@functools.lru_cache(maxsize=32)
+def generate_grid_layout(n_symbols: int) -> Tuple[Tuple[float, float, float], ...]:
     """
     Generate a grid layout for the given number of symbols.
-    Returns a list of (x_offset, y_offset, scale) tuples.
+    Returns a tuple of (x_offset, y_offset, scale) tuples.
+
+    Layouts only depend on n_symbols, so each one is computed once.
     """
     # Calculate grid dimensions
     cols = math.ceil(math.sqrt(n_symbols))
@@ -126,35 +161,28 @@ def generate_grid_layout(n_symbols: int) -> List[Tuple[float, float, float]]:
     # Calculate scale based on grid
     scale = 0.9 / max(cols, rows)
 
-    # Generate grid positions
-    layout = []
-    for i in range(n_symbols):
-        row = i // cols
-        col = i % cols
-
-        # Calculate position (centered in cell)
-        x = (col + 0.5) / cols
-        y = (row + 0.5) / rows
+    # Generate grid positions, centered in their cells
+    row, col = np.divmod(np.arange(n_symbols), cols)
+    xs = (col + 0.5) / cols
+    ys = (row + 0.5) / rows
 
-        layout.append((x, y, scale))
+    return tuple(zip(xs.tolist(), ys.tolist(), [scale] * n_symbols))
 
-    return layout
 
-def generate_smart_layout(n_symbols: int) -> List[Tuple[float, float, float]]:
+@functools.lru_cache(maxsize=32)
+def generate_smart_layout(n_symbols: int) -> Tuple[Tuple[float, float, float], ...]:
     """
     Generate an optimized symbol layout that maximizes space usage.
     
     Uses a force-directed placement algorithm to position symbols efficiently.
+    The layout is deterministic, so it is only optimized once per n_symbols.
     
     Args:
         n_symbols: Number of symbols to place
         
     Returns:
-        List of (x_offset, y_offset, scale) tuples
+        Tuple of (x_offset, y_offset, scale) tuples
     """
-    import random
-    import math
-    
     # Size constraints
     min_scale = 0.15
     max_scale = 0.45
@@ -181,12 +209,11 @@ def generate_smart_layout(n_symbols: int) -> List[Tuple[float, float, float]]:
     
     # Place remaining symbols in a circle
     radius = 0.35  # Distance from center as fraction of diameter
-    for i in range(remaining):
-        angle = 2 * math.pi * i / remaining
-        x = 0.5 + radius * math.cos(angle)
-        y = 0.5 + radius * math.sin(angle)
-        scale = base_scale * 0.8  # Slightly smaller than center symbol
-        positions.append([x, y, scale])
+    angles = 2 * np.pi * np.arange(remaining) / remaining
+    scale = base_scale * 0.8  # Slightly smaller than center symbol
+    positions.extend(zip((0.5 + radius * np.cos(angles)).tolist(),
+                         (0.5 + radius * np.sin(angles)).tolist(),
+                         [scale] * remaining))
     
     # Now refine the placement with force-directed algorithm
     # Parameters
@@ -194,62 +221,50 @@ def generate_smart_layout(n_symbols: int) -> List[Tuple[float, float, float]]:
     repulsion = 0.01  # Symbol-to-symbol repulsion strength
     boundary = 0.02   # Boundary repulsion strength
     min_distance = 0.1  # Minimum preferred distance between symbols
-    
+    tolerance = 1e-4  # Largest step of a symbol that still counts as moving
+
+    # Forces are computed for all pairs of symbols at once; with a dozen
+    # symbols per card at most, that beats approximations such as Barnes-Hut.
+    # Positions are complex numbers (x + yj), so pairwise offsets and
+    # distances take one operation each, and `xy` views the same memory as
+    # (x, y) rows. Scales stay fixed here, so the required distance between
+    # each pair and the bounds are constant
+    layout = np.array(positions, dtype=float).reshape(-1, 3)
+    scales = layout[:, 2]
+    points = layout[:, 0] + 1j * layout[:, 1]
+    xy = points.view(np.float64).reshape(-1, 2)
+    required_distance = (scales[:, None] + scales[None, :]) * 0.6
+    lower = np.repeat(scales[:, None] * 0.6, 2, axis=1)
+    upper = 1.0 - lower
+
     # Run optimization
     for _ in range(iterations):
-        for i in range(len(positions)):
-            force_x, force_y = 0, 0
-            
-            # Forces between symbols (repulsion)
-            for j in range(len(positions)):
-                if i == j:
-                    continue
-                
-                # Get positions and sizes
-                x1, y1, scale1 = positions[i]
-                x2, y2, scale2 = positions[j]
-                
-                # Calculate distance
-                dx = x1 - x2
-                dy = y1 - y2
-                distance = max(0.001, math.sqrt(dx*dx + dy*dy))
-                
-                # Calculate required distance based on symbol sizes
-                required_distance = (scale1 + scale2) * 0.6
-                
-                # Apply force if too close
-                if distance < required_distance:
-                    force = repulsion * (required_distance - distance) / distance
-                    force_x += dx * force
-                    force_y += dy * force
-            
-            # Boundary force (keep symbols inside card)
-            x, y, scale = positions[i]
-            
-            # Distance from edge
-            edge_dist_left = x - scale*0.6
-            edge_dist_right = 1.0 - x - scale*0.6
-            edge_dist_top = y - scale*0.6
-            edge_dist_bottom = 1.0 - y - scale*0.6
-            
-            # Apply inward force if too close to edge
-            if edge_dist_left < 0.05:
-                force_x += boundary * (0.05 - edge_dist_left) / max(0.001, edge_dist_left)
-            if edge_dist_right < 0.05:
-                force_x -= boundary * (0.05 - edge_dist_right) / max(0.001, edge_dist_right)
-            if edge_dist_top < 0.05:
-                force_y += boundary * (0.05 - edge_dist_top) / max(0.001, edge_dist_top)
-            if edge_dist_bottom < 0.05:
-                force_y -= boundary * (0.05 - edge_dist_bottom) / max(0.001, edge_dist_bottom)
-            
-            # Update position
-            positions[i][0] += force_x
-            positions[i][1] += force_y
-            
-            # Ensure positions stay within bounds
-            positions[i][0] = max(positions[i][2]*0.6, min(1.0 - positions[i][2]*0.6, positions[i][0]))
-            positions[i][1] = max(positions[i][2]*0.6, min(1.0 - positions[i][2]*0.6, positions[i][1]))
-    
+        # Forces between symbols (repulsion) if they are too close
+        delta = points[:, None] - points
+        distance = np.maximum(np.abs(delta), 0.001)
+        force = np.maximum(required_distance - distance, 0.0)
+        force *= repulsion / distance
+        shift = (delta * force).sum(axis=1)
+
+        # Boundary force (keep symbols inside card): push inward from the
+        # near (left, top) and far (right, bottom) edges if too close
+        edge_dist = np.concatenate((xy - lower, upper - xy))
+        push = np.maximum(0.05 - edge_dist, 0.0)
+        push *= boundary / np.maximum(edge_dist, 0.001)
+        shift += (push[:len(points)] - push[len(points):]).view(np.complex128).ravel()
+
+        # Update positions, keeping them within bounds
+        previous = xy.copy()
+        points += shift
+        np.clip(xy, lower, upper, out=xy)
+
+        # Once no symbol moves noticeably any more, the layout has converged
+        if np.abs(xy - previous).max(initial=0.0) < tolerance:
+            break
+
+    layout[:, 0], layout[:, 1] = points.real, points.imag
+    positions = layout.tolist()
+
     # Optimize scaling - try to expand symbols to fill the card better
     can_expand = True
     expansion_iterations = 10
@@ -299,115 +314,280 @@ def generate_smart_layout(n_symbols: int) -> List[Tuple[float, float, float]]:
                 can_expand = True  # We were able to expand something
     
     # Convert to tuples for final result
-    return [(p[0], p[1], p[2]) for p in positions]
+    return tuple((p[0], p[1], p[2]) for p in positions)
 
-def create_circular_card(symbols: List[int],
-                         images: Dict[int, Image.Image],
-                         size: Tuple[int, int] = (800, 800),
-                         background_color: Tuple[int, int, int] = (255, 255, 255),
-                         border_color: Tuple[int, int, int] = (0, 0, 0),
-                         border_width: int = 10,
-                         layout: str = 'smart') -> Image.Image:
+class SymbolCache:
     """
-    Create a circular Dobble card with the given symbols and images.
+    Scaled and rotated symbol images, shared by all cards of a deck.
+
+    Each symbol is resized once per distinct size. Rotations are snapped to
+    ROTATION_STEP buckets and the most recently used ones are kept, so
+    placements that repeat a symbol, size and angle reuse the same image.
+
+    Symbols are resized and rotated in premultiplied alpha ('RGBa'), which
+    Pillow would otherwise convert to and from around every resampling, and
+    only converted back to RGBA once rotated. All symbols are converted up
+    front, and the render threads of a deck all share its cache.
+    Symbols larger than a PDF card are shrunk while they are converted, since
+    no placement can use more pixels than that.
     """
-    # Create a blank card with the given background color
-    card = Image.new('RGBA', size, background_color)
-    draw = ImageDraw.Draw(card)
 
-    # Calculate circle parameters
+    def __init__(self, images: Dict[int, Image.Image], max_rotated: int = 256):
+        self.images = images
+        self._premultiplied = {symbol: self._prepare(img) for symbol, img in images.items()}
+        self._scaled: Dict[Tuple[int, int], Image.Image] = {}
+        self._rotated = functools.lru_cache(maxsize=max_rotated)(self._rotate)
+
+    @staticmethod
+    def _prepare(img: Image.Image) -> Image.Image:
+        img = (img if img.mode == 'RGBA' else img.convert('RGBA')).convert('RGBa')
+        img.thumbnail(PDF_CARD_PIXELS, Image.LANCZOS)
+        return img
+
+    def __contains__(self, symbol: int) -> bool:
+        return symbol in self.images
+
+    def scaled(self, symbol: int, size: int) -> Image.Image:
+        """Get a symbol resized to a square of the given size, in premultiplied alpha."""
+        img = self._scaled.get((symbol, size))
+        if img is None:
+            img = self._scaled[(symbol, size)] = self._premultiplied[symbol].resize((size, size), Image.LANCZOS)
+        return img
+
+    def get(self, symbol: int, size: int, rotation: float) -> Image.Image:
+        """
+        Get a symbol resized to the given size and rotated by about `rotation` degrees.
+
+        The rotated image is large enough to hold the whole symbol, so it is
+        wider than `size` unless the rotation is a multiple of 90 degrees.
+        """
+        return self._rotated(symbol, size, round(rotation / ROTATION_STEP) * ROTATION_STEP)
+
+    def _rotate(self, symbol: int, size: int, rotation: int) -> Image.Image:
+        # Grow the image to fit the rotated symbol so its corners are not cut off
+        return self.scaled(symbol, size).rotate(rotation, resample=Image.BICUBIC, expand=True).convert('RGBA')
+
+
+@functools.lru_cache(maxsize=8)
+def circular_mask(size: Tuple[int, int], border_width: int) -> Image.Image:
+    """
+    Get the mask that clips symbols to the inside of a circular card's border.
+
+    The mask only depends on the card size and border width, so it is built
+    once and shared by every card; it must not be modified.
+
+    Returns:
+        'L' image of the card's size, 255 where symbols show
+    """
     center = (size[0] // 2, size[1] // 2)
     radius = min(size) // 2 - border_width // 2
-    inner_radius = radius - border_width  # For clipping images
+    inner_radius = radius - border_width
 
-    # Create a circular mask for clipping symbols
     mask = Image.new('L', size, 0)
-    mask_draw = ImageDraw.Draw(mask)
-    mask_draw.ellipse(
+    ImageDraw.Draw(mask).ellipse(
         [(center[0] - inner_radius, center[1] - inner_radius),
          (center[0] + inner_radius, center[1] + inner_radius)],
         fill=255
     )
+    return mask
+
+
+@functools.lru_cache(maxsize=8)
+def blank_card(size: Tuple[int, int],
+               background_color: Tuple[int, int, int],
+               border_color: Tuple[int, int, int],
+               border_width: int,
+               card_shape: str = 'circle') -> Image.Image:
+    """
+    Get a card with its background and border but no symbols.
 
-    # Draw a circular border
-    draw.ellipse(
-        [(center[0] - radius, center[1] - radius),
-         (center[0] + radius, center[1] + radius)],
-        outline=border_color,
-        width=border_width
+    Blank cards are the same for every card of a deck, so each one is drawn
+    once; callers must copy it before drawing on it.
+    """
+    # Create a blank card with the given background color
+    card = Image.new('RGBA', size, background_color)
+    draw = ImageDraw.Draw(card)
+
+    if card_shape == 'square':
+        # Draw a square border
+        border_rect = [
+            border_width // 2,
+            border_width // 2,
+            size[0] - border_width // 2,
+            size[1] - border_width // 2
+        ]
+        draw.rectangle(border_rect, outline=border_color, width=border_width)
+    else:
+        # Calculate circle parameters
+        center = (size[0] // 2, size[1] // 2)
+        radius = min(size) // 2 - border_width // 2
+
+        # Draw a circular border
+        draw.ellipse(
+            [(center[0] - radius, center[1] - radius),
+             (center[0] + radius, center[1] + radius)],
+            outline=border_color,
+            width=border_width
+        )
+
+    return card
+
+
+def place_symbols(symbols: List[int],
+                  card_shape: str = 'circle',
+                  layout: str = 'circle',
+                  seed: Seed = None) -> List[Placement]:
+    """
+    Pick where each symbol of a card goes.
+
+    Positions come from the layout and are jittered at random, so a card that
+    is exported more than once must reuse its placements for the exports to
+    match.
+
+    Args:
+        symbols: List of symbol IDs to place on the card
+        card_shape: Shape of the card ('circle' or 'square')
+        layout: Layout type ('smart', 'circle' or 'grid')
+        seed: Optional seed or NumPy generator for reproducible jitter
+
+    Returns:
+        List of (symbol, x_offset, y_offset, scale, rotation) tuples
+    """
+    if card_shape == 'square':
+        # Square cards only come in grid and circular layouts
+        if layout == 'grid':
+            positions = generate_grid_layout(len(symbols))
+        else:
+            positions = generate_circular_layout(len(symbols))
+        # Move symbols around within their zone and add some random rotation
+        max_jitter, max_rotation = 0.05, 30
+    else:
+        if layout == 'smart':
+            positions = generate_smart_layout(len(symbols))
+        elif layout == 'grid':
+            positions = generate_grid_layout(len(symbols))
+        else:  # 'circle' is the default
+            positions = generate_circular_layout(len(symbols))
+        # Controlled jitter that preserves the layout
+        max_jitter, max_rotation = 0.02, 25
+
+    if len(symbols) > len(positions):
+        logger.warning(f"Not enough positions for all symbols on card")
+
+    # Draw the offsets and rotations of all symbols at once
+    n_placed = min(len(symbols), len(positions))
+    jitter = np.random.default_rng(seed).uniform(
+        (-max_jitter, -max_jitter, -max_rotation),
+        (max_jitter, max_jitter, max_rotation),
+        size=(n_placed, 3)
     )
+    placed = np.array(positions[:n_placed], dtype=float).reshape(n_placed, 3)
+    placed[:, :2] += jitter[:, :2]
+    # Snap rotations to the angles SymbolCache renders, so the PDF, which
+    # rotates by the exact angle, matches the PNGs
+    rotations = np.round(jitter[:, 2] / ROTATION_STEP) * ROTATION_STEP
+
+    return [
+        (symbol, x, y, scale, rotation)
+        for symbol, (x, y, scale), rotation in zip(symbols, placed.tolist(), rotations.tolist())
+    ]
 
-    # Select the appropriate layout
-    if layout == 'smart':
-        positions = generate_smart_layout(len(symbols))
-    elif layout == 'grid':
-        positions = generate_grid_layout(len(symbols))
-    else:  # 'circle' is the default
-        positions = generate_circular_layout(len(symbols))
-
-    # Randomize rotation for each symbol
-    positions_randomized = []
-    for x, y, scale in positions:
-        # Add random rotation, but more controlled jitter to preserve layout
-        x_jitter = random.uniform(-0.02, 0.02)
-        y_jitter = random.uniform(-0.02, 0.02)
-        rotation = random.uniform(-25, 25)
-        positions_randomized.append((x + x_jitter, y + y_jitter, scale, rotation))
 
-    # Place each symbol on the card
-    for i, symbol in enumerate(symbols):
-        if i >= len(positions_randomized):
-            logger.warning(f"Not enough positions for all symbols on card")
-            break
+def create_circular_card(symbols: List[int],
+                         images: Dict[int, Image.Image],
+                         size: Tuple[int, int] = (800, 800),
+                         background_color: Tuple[int, int, int] = (255, 255, 255),
+                         border_color: Tuple[int, int, int] = (0, 0, 0),
+                         border_width: int = 10,
+                         layout: str = 'smart',
+                         symbol_cache: Optional[SymbolCache] = None,
+                         placements: Optional[List[Placement]] = None,
+                         seed: Seed = None) -> Image.Image:
+    """
+    Create a circular Dobble card with the given symbols and images.
+
+    Symbols are placed according to `layout`, jittered from `seed`, unless
+    their placements were already picked with place_symbols.
+    """
+    # Start from a blank card with the given background color and border
+    card = blank_card(tuple(size), tuple(background_color), tuple(border_color), border_width, 'circle').copy()
 
+    if placements is None:
+        placements = place_symbols(symbols, 'circle', layout, seed)
+
+    if symbol_cache is None:
+        symbol_cache = SymbolCache(images)
+
+    mask = circular_mask(tuple(size), border_width)
+
+    # Place each symbol on the card
+    for symbol, x, y, scale, rotation in placements:
         # Get the image for this symbol
         if symbol not in images:
             logger.warning(f"No image found for symbol {symbol}")
             continue
 
-        img = images[symbol]
-
-        # Get position and scale for this symbol
-        x, y, scale, rotation = positions_randomized[i]
-
         # Calculate pixel position
         px = int(x * size[0])
         py = int(y * size[1])
 
-        # Scale the image
+        # Scale and rotate the image
         scaled_size = int(min(size) * scale)
-        img_scaled = img.resize((scaled_size, scaled_size), Image.LANCZOS)
+        img_rotated = symbol_cache.get(symbol, scaled_size, rotation)
 
-        # Rotate the image
-        img_rotated = img_scaled.rotate(rotation, resample=Image.BICUBIC, expand=False)
-
-        # Create a temporary image for this symbol
-        temp = Image.new('RGBA', size, (0, 0, 0, 0))
-        
         # Calculate paste position (centered on the point)
         paste_x = px - img_rotated.width // 2
         paste_y = py - img_rotated.height // 2
 
-        # Paste the image onto the temporary image
-        temp.paste(img_rotated, (paste_x, paste_y), img_rotated)
-        
-        # Apply the circular mask to clip the symbol
-        r, g, b, a = temp.split()
-        a = ImageChops.multiply(a, mask)
-        temp = Image.merge('RGBA', (r, g, b, a))
-
-        # Composite this symbol onto the card
-        card = Image.alpha_composite(card, temp)
+        # Composite this symbol onto the card, clipped by the circular mask
+        blend_symbol(card, img_rotated, mask, paste_x, paste_y)
 
     return card
 
+def blend_symbol(card: Image.Image, symbol: Image.Image, mask: Image.Image, x: int, y: int) -> None:
+    """
+    Alpha-composite a symbol onto a card in place, clipped by a mask.
+
+    Only the symbol's bounding box is touched: the symbol's alpha is multiplied
+    by the matching crop of the mask and the result is composited in one pass.
+    Symbols wholly inside the mask are composited straight away.
+
+    Args:
+        card: RGBA card image
+        symbol: RGBA symbol image
+        mask: 'L' clip mask of the card's size
+        x: Horizontal position of the symbol's top-left corner
+        y: Vertical position of the symbol's top-left corner
+    """
+    # Clip the symbol's bounding box to the card
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + symbol.width, card.width), min(y + symbol.height, card.height)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    source_box = (x0 - x, y0 - y, x1 - x, y1 - y)
+    mask_box = mask.crop((x0, y0, x1, y1))
+
+    # Symbols that lie wholly inside the mask need no clipping
+    if mask_box.getextrema()[0] == 255:
+        card.alpha_composite(symbol, (x0, y0), source_box)
+        return
+
+    clipped = symbol.crop(source_box)
+    clipped.putalpha(ImageChops.multiply(clipped.getchannel('A'), mask_box))
+    card.alpha_composite(clipped, (x0, y0))
+
+
 def create_square_card(symbols: List[int],
                        images: Dict[int, Image.Image],
                        size: Tuple[int, int] = (800, 800),
                        background_color: Tuple[int, int, int] = (255, 255, 255),
                        border_color: Tuple[int, int, int] = (0, 0, 0),
                        border_width: int = 10,
-                       layout: str = 'circle') -> Image.Image:
+                       layout: str = 'circle',
+                       symbol_cache: Optional[SymbolCache] = None,
+                       placements: Optional[List[Placement]] = None,
+                       seed: Seed = None) -> Image.Image:
     """
     Create a square Dobble card with the given symbols and images.
 
@@ -419,65 +599,36 @@ def create_square_card(symbols: List[int],
         border_color: Border color as RGB tuple
         border_width: Width of the border in pixels
         layout: Layout type ('circle' or 'grid')
+        symbol_cache: Optional cache of scaled symbols shared across cards
+        placements: Optional placements picked with place_symbols
+        seed: Optional seed for the layout jitter
 
     Returns:
         PIL Image of the rendered card
     """
-    # Create a blank card with the given background color
-    card = Image.new('RGBA', size, background_color)
-    draw = ImageDraw.Draw(card)
+    # Start from a blank card with the given background color and border
+    card = blank_card(tuple(size), tuple(background_color), tuple(border_color), border_width, 'square').copy()
 
-    # Draw a square border
-    border_rect = [
-        border_width // 2,
-        border_width // 2,
-        size[0] - border_width // 2,
-        size[1] - border_width // 2
-    ]
-    draw.rectangle(border_rect, outline=border_color, width=border_width)
-
-    # Select the appropriate layout
-    if layout == 'grid':
-        positions = generate_grid_layout(len(symbols))
-    else:  # 'circle' is the default
-        positions = generate_circular_layout(len(symbols))
-
-    # Randomize the position of each symbol (within its assigned zone)
-    positions_randomized = []
-    for x, y, scale in positions:
-        # Add some random variation to position (±10%)
-        x_jitter = random.uniform(-0.05, 0.05)
-        y_jitter = random.uniform(-0.05, 0.05)
-        # Add some random rotation
-        rotation = random.uniform(-30, 30)
-        positions_randomized.append((x + x_jitter, y + y_jitter, scale, rotation))
+    if placements is None:
+        placements = place_symbols(symbols, 'square', layout, seed)
 
-    # Place each symbol on the card
-    for i, symbol in enumerate(symbols):
-        if i >= len(positions_randomized):
-            logger.warning(f"Not enough positions for all symbols on card")
-            break
+    if symbol_cache is None:
+        symbol_cache = SymbolCache(images)
 
+    # Place each symbol on the card
+    for symbol, x, y, scale, rotation in placements:
         # Get the image for this symbol
         if symbol not in images:
             logger.warning(f"No image found for symbol {symbol}")
             continue
 
-        img = images[symbol]
-
-        # Get position and scale for this symbol
-        x, y, scale, rotation = positions_randomized[i]
-
         # Calculate pixel position
         px = int(x * size[0])
         py = int(y * size[1])
 
-        # Scale the image
+        # Scale and rotate the image
         scaled_size = int(min(size) * scale)
-        img_scaled = img.resize((scaled_size, scaled_size), Image.LANCZOS)
-
-        # Rotate the image
-        img_rotated = img_scaled.rotate(rotation, resample=Image.BICUBIC, expand=False)
+        img_rotated = symbol_cache.get(symbol, scaled_size, rotation)
 
         # Calculate paste position (centered on the point)
         paste_x = px - img_rotated.width // 2
@@ -495,9 +646,15 @@ def create_cards_pdf(job_id: str,
                    card_shape: str = 'circle',
                    card_size: str = 'A4',
                    layout: str = 'circle',
-                   cards_per_page: int = 4) -> str:
+                   cards_per_page: int = 4,
+                   placements: Optional[List[List[Placement]]] = None,
+                   symbol_cache: Optional[SymbolCache] = None) -> str:
     """
     Create a PDF with multiple Dobble cards, optimized for A4 with 4 cards per page.
+
+    Cards are drawn as vector graphics (see draw_card_pdf), with their symbols
+    placed as given in `placements` or picked with place_symbols, and taken
+    from `symbol_cache` when it is given.
     """
     # Force A4 for optimal layout with 4 cards per page
     page_size = A4
@@ -514,12 +671,6 @@ def create_cards_pdf(job_id: str,
     card_width = card_size
     card_height = card_size
     
-    # Card render size in pixels (for high quality)
-    card_pixels = (1000, 1000)
-    
-    # Calculate number of pages needed
-    n_pages = math.ceil(len(cards) / cards_per_page)
-    
     # Create output file path
     output_file = os.path.join(output_dir, f"{job_id}.pdf")
     
@@ -538,47 +689,121 @@ def create_cards_pdf(job_id: str,
         (2*h_margin + card_width, v_margin)                            # Bottom right
     ]
     
-    # Generate each page
-    for page in range(n_pages):
-        # Get the cards for this page
-        page_cards = cards[page * cards_per_page: min((page + 1) * cards_per_page, len(cards))]
-        
-        # Place each card on the page
-        for i, card_symbols in enumerate(page_cards):
-            if i >= len(positions):
-                break
-                
-            # Get position for this card
-            x, y = positions[i]
-            
-            # Create the card image
-            if card_shape == 'square':
-                card_img = create_square_card(card_symbols, images, card_pixels, layout=layout)
-            else:  # 'circle' is the default
-                card_img = create_circular_card(card_symbols, images, card_pixels, layout=layout)
-            
-            # Save the card image temporarily
-            card_file = os.path.join(output_dir, f"{job_id}_card_{page}_{i}.png")
-            card_img.save(card_file, format='PNG')
-            
-            # Add the card to the PDF - use same width and height to keep aspect ratio
-            c.drawImage(card_file, x, y, width=card_width, height=card_height, preserveAspectRatio=True)
-            
-            # Add a small card number for reference
-            c.setFont("Helvetica", 8)
-            c.drawString(x + 5, y + 5, f"Card #{page * cards_per_page + i + 1}")
-            
-            # Delete the temporary file
-            os.remove(card_file)
-        
-        # Finish the page
+    if placements is None:
+        rng = np.random.default_rng()
+        placements = [place_symbols(card_symbols, card_shape, layout, rng) for card_symbols in cards]
+
+    # Symbols are shared by all cards, so each one is embedded once per size
+    if symbol_cache is None:
+        symbol_cache = SymbolCache(images)
+    symbol_readers: Dict[Tuple[int, int], ImageReader] = {}
+
+    # Place each card on its page
+    for n, card_placements in enumerate(placements):
+        # Get position for this card
+        x, y = positions[n % cards_per_page]
+
+        # Add the card to the PDF - use same width and height to keep aspect ratio
+        draw_card_pdf(c, card_placements, symbol_cache, x, y, card_width, card_shape, symbol_readers=symbol_readers)
+
+        # Add a small card number for reference
+        c.setFont("Helvetica", 8)
+        c.drawString(x + 5, y + 5, f"Card #{n + 1}")
+
+        # Finish the page once it is full
+        if n % cards_per_page == cards_per_page - 1:
+            c.showPage()
+
+    # Finish the last, partly filled page
+    if len(placements) % cards_per_page:
         c.showPage()
-    
+
     # Save the PDF
     c.save()
     
     return output_file
 
+def draw_card_pdf(c: canvas.Canvas,
+                  placements: List[Placement],
+                  symbol_cache: SymbolCache,
+                  x: float,
+                  y: float,
+                  size: float,
+                  card_shape: str = 'circle',
+                  border_color: Tuple[int, int, int] = (0, 0, 0),
+                  border_width: int = 10,
+                  symbol_readers: Optional[Dict[Tuple[int, int], ImageReader]] = None) -> None:
+    """
+    Draw a card onto a PDF canvas as vector graphics.
+
+    The border and the clip path are PDF paths, and the symbols are placed and
+    rotated by the canvas. Each symbol image is embedded at the size it has on
+    a PDF_CARD_PIXELS render, and ReportLab stores identical images only once.
+
+    Args:
+        c: Canvas to draw on
+        placements: Placements of the card's symbols (see place_symbols)
+        symbol_cache: Scaled symbol images
+        x: Left edge of the card on the page
+        y: Bottom edge of the card on the page
+        size: Width and height of the card in points
+        card_shape: Shape of the card ('circle' or 'square')
+        border_color: Border color as RGB tuple
+        border_width: Width of the border in pixels of a PDF_CARD_PIXELS render
+        symbol_readers: Optional cache of symbol images shared across cards
+    """
+    if symbol_readers is None:
+        symbol_readers = {}
+
+    # Points per pixel of a PDF_CARD_PIXELS render
+    pixels = min(PDF_CARD_PIXELS)
+    unit = size / pixels
+    center_x, center_y = x + size / 2, y + size / 2
+
+    # Clip the symbols to the inside of the border
+    c.saveState()
+    clip = c.beginPath()
+    if card_shape == 'square':
+        clip.rect(x, y, size, size)
+    else:
+        inner_radius = pixels // 2 - border_width // 2 - border_width
+        clip.circle(center_x, center_y, inner_radius * unit)
+    c.clipPath(clip, stroke=0, fill=0)
+
+    for symbol, sx, sy, scale, rotation in placements:
+        if symbol not in symbol_cache:
+            logger.warning(f"No image found for symbol {symbol}")
+            continue
+
+        scaled_size = int(pixels * scale)
+        reader = symbol_readers.get((symbol, scaled_size))
+        if reader is None:
+            reader = symbol_readers[(symbol, scaled_size)] = ImageReader(
+                symbol_cache.scaled(symbol, scaled_size).convert('RGBA')
+            )
+
+        # Offsets are measured from the top of the card, PDF coordinates from the bottom
+        side = scaled_size * unit
+        c.saveState()
+        c.translate(x + sx * size, y + (1 - sy) * size)
+        c.rotate(rotation)
+        c.drawImage(reader, -side / 2, -side / 2, width=side, height=side, mask='auto')
+        c.restoreState()
+
+    c.restoreState()
+
+    # Draw the border, stroked along the middle of the rendered border
+    c.saveState()
+    c.setStrokeColorRGB(*(channel / 255 for channel in border_color))
+    c.setLineWidth(border_width * unit)
+    inset = (border_width // 2 + border_width / 2) * unit
+    if card_shape == 'square':
+        c.rect(x + inset, y + inset, size - 2 * inset, size - 2 * inset, stroke=1, fill=0)
+    else:
+        c.circle(center_x, center_y, size / 2 - inset, stroke=1, fill=0)
+    c.restoreState()
+
+
 def generate_cards(job_id: str,
                    cards: List[List[int]],
                    images: Dict[int, Image.Image],
@@ -587,7 +812,9 @@ def generate_cards(job_id: str,
                    card_size: str = 'A4',
                    layout: str = 'circle',
                    cards_per_page: int = 4,
-                   export_png: bool = True) -> Tuple[str, List[str]]:
+                   export_png: bool = True,
+                   png_dir: Optional[str] = None,
+                   seed: Optional[int] = None) -> Tuple[str, List[str]]:
     """
     Generate Dobble cards and save as PDF and optionally PNG.
 
@@ -601,35 +828,122 @@ def generate_cards(job_id: str,
         layout: Layout of symbols on the cards ('circle' or 'grid')
         cards_per_page: Number of cards to place on each page (1, 2, 4, or 9)
         export_png: Whether to also export individual card images as PNG
+        png_dir: Directory for the PNG images (defaults to output_dir)
+        seed: Optional seed that makes the symbol placements reproducible
 
     Returns:
         Tuple of (PDF path, list of PNG paths)
     """
-    # Create PDF with optimized settings
-    pdf_path = create_cards_pdf(
-        job_id,
-        cards,
-        images,
-        output_dir,
-        card_shape,
-        card_size,
-        layout,
-        cards_per_page
-    )
+    # Symbols are placed once, so the PDF and the PNGs show the same cards
+    rng = np.random.default_rng(seed)
+    placements = [place_symbols(card_symbols, card_shape, layout, rng) for card_symbols in cards]
+
+    # The PDF and the PNG renders share one cache of converted symbols
+    symbol_cache = SymbolCache(images)
+
+    if not export_png:
+        pdf_path = create_cards_pdf(
+            job_id, cards, images, output_dir, card_shape, card_size, layout, cards_per_page, placements, symbol_cache
+        )
+        return pdf_path, []
+
+    # Export individual cards as PNG, rendered on the render pool while the
+    # PDF is drawn
+    png_paths = card_png_paths(job_id, len(cards), png_dir or output_dir)
+    with _render_slots:
+        saved = map_save_cards(get_render_pool(), cards, png_paths, symbol_cache, card_shape, layout, placements)
+        pdf_path = create_cards_pdf(
+            job_id, cards, images, output_dir, card_shape, card_size, layout, cards_per_page, placements, symbol_cache
+        )
+        list(saved)
+
+    return pdf_path, png_paths
+
+
+def card_png_paths(job_id: str, n_cards: int, output_dir: str) -> List[str]:
+    """Get the PNG paths of a job's cards, creating their directory."""
+    os.makedirs(output_dir, exist_ok=True)
+    return [os.path.join(output_dir, f"{job_id}_card_{i}.png") for i in range(n_cards)]
+
+
+def render_card(card_symbols: List[int],
+                symbol_cache: SymbolCache,
+                size: Tuple[int, int],
+                card_shape: str = 'circle',
+                layout: str = 'circle',
+                placements: Optional[List[Placement]] = None) -> Image.Image:
+    """Render a single card in the given shape."""
+    images = symbol_cache.images
+    if card_shape == 'square':
+        return create_square_card(card_symbols, images, size, layout=layout, symbol_cache=symbol_cache,
+                                  placements=placements)
+    # 'circle' is the default
+    return create_circular_card(card_symbols, images, size, layout=layout, symbol_cache=symbol_cache,
+                                placements=placements)
+
+
+def save_card(card_symbols: List[int],
+              path: str,
+              symbol_cache: SymbolCache,
+              size: Tuple[int, int],
+              card_shape: str = 'circle',
+              layout: str = 'circle',
+              placements: Optional[List[Placement]] = None) -> str:
+    """Render a single card and save it as a PNG, returning its path."""
+    card = render_card(card_symbols, symbol_cache, size, card_shape, layout, placements)
+    # Cards have an opaque background, so their alpha channel only costs
+    # encoding time and file size
+    card.convert('RGB').save(path, format='PNG')
+    return path
+
+
+def get_render_pool() -> Executor:
+    """
+    Get the render pool of this process, starting it on first use.
 
-    # Export individual cards as PNG if requested
-    png_paths = []
-    if export_png:
-        for i, card_symbols in enumerate(cards):
-            # Create the card image
-            if card_shape == 'square':
-                card_img = create_square_card(card_symbols, images, (800, 800), layout=layout)
-            else:  # 'circle' is the default
-                card_img = create_circular_card(card_symbols, images, (800, 800), layout=layout)
-
-            # Save the card image
-            png_path = os.path.join(output_dir, f"{job_id}_card_{i}.png")
-            card_img.save(png_path, format='PNG')
-            png_paths.append(png_path)
-
-    return pdf_path, png_paths
\ No newline at end of file
+    The pool is started lazily, so each forked gunicorn worker gets its own
+    after the fork, and is then kept for every deck the worker renders.
+    Cards are rendered on threads sharing one SymbolCache per deck; Pillow
+    releases the GIL while it resamples and composites, so they still render
+    in parallel.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='render')
+        return _render_pool
+
+
+def render_chunksize(n_cards: int) -> int:
+    """
+    Get how many cards to send to a render thread at a time.
+
+    The render pool is sized once for the machine, so a deck is split into
+    batches of this many cards instead: batches cut the per-task overhead,
+    while leaving about four batches per thread to even out the load.
+    """
+    return max(1, n_cards // (4 * (os.cpu_count() or 1)))
+
+
+def map_save_cards(executor: Executor,
+                   cards: List[List[int]],
+                   png_paths: List[str],
+                   symbol_cache: SymbolCache,
+                   card_shape: str,
+                   layout: str,
+                   placements: List[Optional[List[Placement]]]) -> Iterator[List[str]]:
+    """Save cards as PNGs on an executor in batches (see render_chunksize), yielding the paths of each batch."""
+    jobs = list(zip(cards, png_paths, placements))
+    chunksize = render_chunksize(len(jobs))
+    batches = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    return executor.map(_save_card_batch, batches, repeat(symbol_cache), repeat(card_shape), repeat(layout))
+
+
+def _save_card_batch(batch: List[Tuple[List[int], str, Optional[List[Placement]]]],
+                     symbol_cache: SymbolCache,
+                     card_shape: str,
+                     layout: str) -> List[str]:
+    return [
+        save_card(card_symbols, path, symbol_cache, PNG_CARD_PIXELS, card_shape, layout, card_placements)
+        for card_symbols, path, card_placements in batch
+    ]
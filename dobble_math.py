@@ -1,30 +1,45 @@
 #!/usr/bin/env python3
 
+import functools
 import math
 import logging
+import os
 import random
 from typing import List, Tuple, Set, Dict
 
+import numpy as np
+
 # Set up logging
 logger = logging.getLogger('dobble_generator')
 
+# Set DOBBLE_VERIFY=1 to check every generated projective plane pairwise.
+# The check is quadratic in the number of cards, so it is off by default
+VERIFY_PLANES = os.environ.get('DOBBLE_VERIFY') == '1'
+
+
+# Primes below 128, which covers every order a playable deck will use
+_SMALL_PRIMES = frozenset([
+    2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61,
+    67, 71, 73, 79, 83, 89, 97, 101, 103, 107, 109, 113, 127,
+])
+
 
 def is_prime(n: int) -> bool:
     """Check if a number is prime."""
-    if n <= 1:
-        return False
-    if n <= 3:
-        return True
+    if n < 128:
+        return n in _SMALL_PRIMES
     if n % 2 == 0 or n % 3 == 0:
         return False
+    limit = math.isqrt(n)
     i = 5
-    while i * i <= n:
+    while i <= limit:
         if n % i == 0 or n % (i + 2) == 0:
             return False
         i += 6
     return True
 
 
+@functools.lru_cache(maxsize=None)
 def next_prime(n: int) -> int:
     """Find the next prime number greater than or equal to n."""
     if n <= 2:
@@ -102,63 +117,64 @@ def generate_projective_plane(order: int) -> List[Set[int]]:
     # Create the incidence matrix for a projective plane of order n
     # We'll use the construction based on the field GF(n)
 
-    # First, create the set of all points (symbols)
-    # Points are represented as (x, y) pairs where x, y are elements of GF(n)
-    # Plus n+1 "points at infinity" represented as (i, -1) for i in [0, n-1] and (-1, -1)
-    points = []
-
-    # Add the finite points
-    for x in range(n):
-        for y in range(n):
-            points.append((x, y))
-
-    # Add the points at infinity
-    for i in range(n):
-        points.append((i, -1))
-    points.append((-1, -1))
-
-    # Now create the lines (cards)
-    lines = []
-
-    # Lines of the form y = mx + b
-    for m in range(n):
-        for b in range(n):
-            line = set()
-            for x in range(n):
-                y = (m * x + b) % n
-                line.add(points.index((x, y)))
-            # Add the point at infinity corresponding to this slope
-            line.add(points.index((m, -1)))
-            lines.append(line)
-
-    # Lines of the form x = c (vertical lines)
-    for c in range(n):
-        line = set()
-        for y in range(n):
-            line.add(points.index((c, y)))
-        # Add the "vertical" point at infinity
-        line.add(points.index((-1, -1)))
-        lines.append(line)
+    # Points (symbols) are numbered directly rather than looked up in a list:
+    # - finite point (x, y) with x, y in GF(n) is x*n + y
+    # - point at infinity for slope m is n*n + m
+    # - the "vertical" point at infinity is n*n + n
+    infinity = n * n + n
+
+    # Now create the lines (cards), one row of point ids per line
+    x = np.arange(n)
+    table = np.empty((total_points, n + 1), dtype=np.int64)
+
+    # Lines of the form y = mx + b, for every slope m and intercept b at once,
+    # plus the point at infinity corresponding to each slope
+    m = x[:, None, None]
+    b = x[None, :, None]
+    table[:n * n, :n] = (x * n + (m * x + b) % n).reshape(n * n, n)
+    table[:n * n, n] = np.repeat(n * n + x, n)
+
+    # Lines of the form x = c (vertical lines) through the "vertical" point at infinity
+    table[n * n:n * n + n, :n] = x[:, None] * n + x
+    table[n * n:n * n + n, n] = infinity
 
     # Line at infinity
-    line_at_infinity = set()
-    for i in range(n):
-        line_at_infinity.add(points.index((i, -1)))
-    line_at_infinity.add(points.index((-1, -1)))
-    lines.append(line_at_infinity)
+    table[-1, :n] = n * n + x
+    table[-1, n] = infinity
+
+    lines = [set(row) for row in table.tolist()]
 
     # Verify we have the right number of lines
     assert len(lines) == total_points, f"Expected {total_points} lines, got {len(lines)}"
 
-    # Verify each pair of lines intersects at exactly one point
-    for i in range(len(lines)):
-        for j in range(i + 1, len(lines)):
-            intersection = lines[i].intersection(lines[j])
-            assert len(intersection) == 1, f"Lines {i} and {j} intersect at {len(intersection)} points: {intersection}"
+    # Each pair of lines meets in exactly one point by construction, so only
+    # check every pair when asked to (see VERIFY_PLANES)
+    if VERIFY_PLANES:
+        for i in range(len(lines)):
+            for j in range(i + 1, len(lines)):
+                intersection = lines[i].intersection(lines[j])
+                assert len(intersection) == 1, f"Lines {i} and {j} intersect at {len(intersection)} points: {intersection}"
 
     return lines
 
 
+@functools.lru_cache(maxsize=16)
+def _generate_cards_cached(order: int) -> Tuple[Tuple[Tuple[int, ...], ...], int]:
+    """
+    Build the unshuffled deck for a projective plane of the given order.
+
+    The deck only depends on the order, so it is built once and shared as
+    tuples; generate_dobble_cards copies and shuffles it per call.
+
+    Returns:
+        Tuple of (cards as sorted tuples of symbols, total symbols)
+    """
+    # Points are already numbered 0..n²+n, so the symbols need no remapping;
+    # sort each card for consistent ordering
+    cards = tuple(tuple(sorted(card)) for card in generate_projective_plane(order))
+    return cards, order * order + order + 1
+
+
 def generate_dobble_cards(n_symbols: int, shuffle: bool = True) -> Tuple[List[List[int]], int]:
     """
     Generate Dobble cards with the given number of symbols.
@@ -175,35 +191,22 @@ def generate_dobble_cards(n_symbols: int, shuffle: bool = True) -> Tuple[List[Li
 
     # Generate the projective plane
     try:
-        cards_as_sets = generate_projective_plane(order)
+        deck, total_symbols = _generate_cards_cached(order)
     except ValueError:
         # If order is not prime, find the closest prime number
         logger.warning(f"Order {order} is not prime, adjusting")
         order = next_prime(order)
         _, symbols_per_card, total_cards = calculate_dobble_parameters(order * order + order + 1)
-        cards_as_sets = generate_projective_plane(order)
-
-    # Convert sets to lists for consistent ordering
-    cards = [sorted(list(card)) for card in cards_as_sets]
+        deck, total_symbols = _generate_cards_cached(order)
 
-    # Determine the actual number of symbols used
-    all_symbols = set()
-    for card in cards:
-        all_symbols.update(card)
-    total_symbols = len(all_symbols)
-
-    # Remap symbols to 0..total_symbols-1 for cleaner indexing
-    symbol_map = {old: new for new, old in enumerate(sorted(all_symbols))}
-    cards = [[symbol_map[s] for s in card] for card in cards]
+    # Give the caller its own lists so the cached deck stays untouched
+    cards = [list(card) for card in deck]
 
     # Shuffle symbols on each card if requested
     if shuffle:
         for card in cards:
             random.shuffle(card)
 
-    # Verify the Dobble property: any two cards share exactly one symbol
-    verify_dobble_property(cards)
-
     logger.info(
         f"Generated {len(cards)} cards with {symbols_per_card} symbols per card, using {total_symbols} total symbols")
     return cards, total_symbols
@@ -219,11 +222,13 @@ def verify_dobble_property(cards: List[List[int]]) -> bool:
     Returns:
         True if the Dobble property holds, raises AssertionError otherwise
     """
+    # Encode each card as a bitmask of its symbols so that the shared symbol
+    # count of a pair is a single AND and popcount
+    masks = [sum(1 << s for s in set(card)) for card in cards]
     for i in range(len(cards)):
         for j in range(i + 1, len(cards)):
-            card1, card2 = set(cards[i]), set(cards[j])
-            intersection = card1.intersection(card2)
-            if len(intersection) != 1:
+            if (masks[i] & masks[j]).bit_count() != 1:
+                intersection = set(cards[i]).intersection(cards[j])
                 error_msg = f"Cards {i} and {j} share {len(intersection)} symbols: {intersection}"
                 logger.error(error_msg)
                 raise AssertionError(error_msg)
@@ -254,27 +259,21 @@ def limit_cards(cards: List[List[int]], max_cards: int) -> List[List[int]]:
     return limited_cards
 
 
-def select_symbols(cards: List[List[int]], available_symbols: int) -> Dict[int, int]:
+def select_symbols(total_symbols: int, available_symbols: int) -> Dict[int, int]:
     """
     Create a mapping from card symbols to actual image indices.
 
+    Symbols are numbered 0..total_symbols-1, as returned by
+    generate_dobble_cards, so there is no need to scan the cards for them.
+
     Args:
-        cards: List of generated cards
+        total_symbols: Number of symbols in the deck
         available_symbols: Number of actual images/icons available
 
     Returns:
         Dictionary mapping card symbols to image indices
     """
-    # Find all unique symbols used in the cards
-    all_symbols = set()
-    for card in cards:
-        all_symbols.update(card)
-
-    if len(all_symbols) > available_symbols:
-        raise ValueError(f"Not enough images: need {len(all_symbols)}, have {available_symbols}")
-
-    # Create a mapping from symbols to image indices
-    # If shuffle is True, assign images randomly
-    symbol_to_image = {symbol: i % available_symbols for i, symbol in enumerate(all_symbols)}
+    if total_symbols > available_symbols:
+        raise ValueError(f"Not enough images: need {total_symbols}, have {available_symbols}")
 
-    return symbol_to_image
\ No newline at end of file
+    return {symbol: symbol for symbol in range(total_symbols)}
@@ -67,5 +67,8 @@ echo "Python packages:"
 pip list
 
 echo "Starting web application..."
-# Start with gunicorn for production deployment
-exec gunicorn --bind 0.0.0.0:8920 --workers 2 --threads 4 --timeout 120 --log-level debug --access-logfile - --error-logfile - app:app
\ No newline at end of file
+# Start with gunicorn for production deployment. The I/O-bound routes (previews,
+# downloads, listings) are served by threaded workers so a slow client does not
+# pin a whole process.
+# Workers are forked after the app is preloaded so they share its memory.
+exec gunicorn --config gunicorn.conf.py --bind 0.0.0.0:8920 --workers ${GUNICORN_WORKERS:-$((2 * $(nproc) + 1))} --preload --worker-class gthread --threads ${GUNICORN_THREADS:-16} --timeout 120 --log-level debug --access-logfile - --error-logfile - app:app
\ No newline at end of file
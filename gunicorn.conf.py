@@ -0,0 +1,8 @@
+# Gunicorn server hooks. The command line options are set in entrypoint.sh.
+
+
+def post_fork(server, worker):
+    # The app is preloaded, so the worker inherits its logging setup but not
+    # the thread that writes the queued records out
+    import app
+    app.start_log_listener()
@@ -1,44 +1,134 @@
 #!/usr/bin/env python3
 import datetime
 import os
+import re
 import logging
-import io
+import tempfile
+import functools
+from concurrent.futures import Executor
 from typing import Dict, List, Tuple, Optional
-from PIL import Image, ImageOps, ImageFilter, ImageEnhance
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
 import requests
-import cairosvg
-from PIL import Image, ImageDraw, ImageFont, ImageChops
+from cairosvg.parser import Tree
+from cairosvg.surface import PNGSurface
 
 # Set up logging
 logger = logging.getLogger('dobble_generator')
 
+# Side length icons are resampled to before padding
+PROCESSED_ICON_SIZE = 400
 
-def process_icons(symbol_to_file: Dict[int, str]) -> Dict[int, Image.Image]:
+# Version of the preprocessing done by preprocess_image, part of the key of
+# cached icons. Bump it whenever the processed output changes
+PREPROCESS_VERSION = 1
+
+
+def process_icons(symbol_to_file: Dict[int, str], executor: Optional[Executor] = None,
+                  cache_dir: Optional[str] = None) -> Dict[int, Image.Image]:
     """
     Process icon images for use in Dobble cards.
 
     Args:
         symbol_to_file: Dictionary mapping symbol IDs to file paths
+        executor: Optional executor to process the icons in parallel
+        cache_dir: Optional directory to cache processed icons in
 
     Returns:
         Dictionary mapping symbol IDs to processed PIL Image objects
     """
     processed_images = {}
 
-    for symbol, file_path in symbol_to_file.items():
-        try:
-            # Load and process the image
-            processed_image = load_and_process_image(file_path)
-            if processed_image:
-                processed_images[symbol] = processed_image
-            else:
-                logger.warning(f"Failed to process image: {file_path}")
-        except Exception as e:
-            logger.error(f"Error processing image {file_path}: {e}")
+    # The loaders log and return None on failure, so they are safe to map
+    if cache_dir:
+        load_image = functools.partial(load_cached_image, cache_dir=cache_dir)
+    else:
+        load_image = load_and_process_image
+    map_images = executor.map if executor is not None else map
+    symbols = list(symbol_to_file)
+    images = map_images(load_image, [symbol_to_file[symbol] for symbol in symbols])
+
+    for symbol, processed_image in zip(symbols, images):
+        if processed_image:
+            processed_images[symbol] = processed_image
+        else:
+            logger.warning(f"Failed to process image: {symbol_to_file[symbol]}")
 
     return processed_images
 
 
+def load_cached_image(file_path: str, cache_dir: str) -> Optional[Image.Image]:
+    """
+    Load a processed image from the cache, processing and caching it on a miss.
+
+    Cache entries are keyed by the source file's name, mtime, size, the
+    processed icon size and PREPROCESS_VERSION, so edited icons and changes
+    to the preprocessing are picked up automatically. Writing an entry
+    removes the older entries of the same file.
+
+    Args:
+        file_path: Path to the image file
+        cache_dir: Directory holding the cached icons
+
+    Returns:
+        Processed PIL Image object, or None if loading failed
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError as e:
+        logger.error(f"Error loading image {file_path}: {e}")
+        return None
+
+    basename = os.path.basename(file_path)
+    cache_name = f"{basename}.{st.st_mtime_ns}.{st.st_size}.{PROCESSED_ICON_SIZE}.v{PREPROCESS_VERSION}.npy"
+    cache_path = os.path.join(cache_dir, cache_name)
+    try:
+        return Image.fromarray(np.load(cache_path, mmap_mode='r'))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cached icon {cache_path}: {e}")
+
+    img = load_and_process_image(file_path)
+    if img is None:
+        return None
+
+    # Write to a temporary file first so readers never see a partial entry
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.asarray(img))
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not cache processed icon {file_path}: {e}")
+    else:
+        remove_stale_cache_entries(cache_dir, basename, cache_name)
+
+    return img
+
+
+def remove_stale_cache_entries(cache_dir: str, basename: str, keep: str) -> None:
+    """Remove the cached icons of a source file other than the entry `keep`."""
+    # Matches entries with and without a PREPROCESS_VERSION, but not those of
+    # other files whose names merely start with `basename`
+    entry_re = re.compile(re.escape(basename) + r'\.\d+\.\d+\.\d+(?:\.v\d+)?\.npy\Z')
+    try:
+        with os.scandir(cache_dir) as entries:
+            stale = [entry.path for entry in entries if entry.name != keep and entry_re.match(entry.name)]
+    except OSError:
+        return
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 def load_and_process_image(file_path: str) -> Optional[Image.Image]:
     """
     Load an image from a file and process it for use in Dobble cards.
@@ -56,8 +146,7 @@ def load_and_process_image(file_path: str) -> Optional[Image.Image]:
 
         if ext == '.svg':
             # Handle SVG files using CairoSVG
-            png_data = cairosvg.svg2png(url=file_path)
-            img = Image.open(io.BytesIO(png_data))
+            img = rasterize_svg(file_path, os.stat(file_path).st_mtime_ns, PROCESSED_ICON_SIZE)
         else:
             # Handle raster images
             img = Image.open(file_path)
@@ -75,76 +164,68 @@ def load_and_process_image(file_path: str) -> Optional[Image.Image]:
         logger.error(f"Error loading image {file_path}: {e}")
         return None
 
-def preprocess_image(img: Image.Image) -> Image.Image:
+
+@functools.lru_cache(maxsize=64)
+def rasterize_svg(file_path: str, mtime_ns: int, output_width: int) -> Image.Image:
     """
-    Preprocess an image for use in Dobble cards.
+    Rasterize an SVG file, caching the result.
+
+    The Cairo surface is wrapped directly instead of going through
+    svg2png, which would DEFLATE-encode the pixels only for Pillow to
+    decode them again. Callers must not modify the returned image.
 
     Args:
-        img: PIL Image object
+        file_path: Path to the SVG file
+        mtime_ns: Modification time of the file, so edited files are re-rendered
+        output_width: Width to render at, close to the processed icon size so
+            Cairo does not rasterize at the SVG's nominal size only to be resized
 
     Returns:
-        Processed PIL Image object
+        RGBA PIL Image object
     """
-    # First crop to remove transparent borders
-    img = crop_transparent(img)
-    
-    # Ensure RGBA mode
-    if img.mode != 'RGBA':
-        img = img.convert('RGBA')
-    
-    # Create a square image with the content centered
-    width, height = img.size
-    max_dim = max(width, height)
-    square_img = Image.new('RGBA', (max_dim, max_dim), (0, 0, 0, 0))
-    
-    # Paste the original image centered
-    paste_x = (max_dim - width) // 2
-    paste_y = (max_dim - height) // 2
-    square_img.paste(img, (paste_x, paste_y), img)
-    
-    # Resize to a standard size
-    img = square_img.resize((400, 400), Image.LANCZOS)
-    
-    # Add minimal padding
-    img = add_padding(img, padding_ratio=0.05)
-    
-    return img
+    surface = PNGSurface(Tree(url=file_path), None, 96, output_width=output_width)
+    try:
+        surface.cairo.flush()
+        # ARGB32 surfaces hold native-endian premultiplied pixels, i.e. BGRa
+        # byte order on little-endian machines
+        return Image.frombuffer('RGBA', (surface.width, surface.height), bytes(surface.cairo.get_data()),
+                                'raw', 'BGRa', surface.cairo.get_stride(), 1)
+    finally:
+        surface.finish()
 
-def resize_maintain_aspect(img: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
+
+def preprocess_image(img: Image.Image) -> Image.Image:
     """
-    Resize an image to a target size while maintaining aspect ratio.
+    Preprocess an image for use in Dobble cards.
 
     Args:
         img: PIL Image object
-        target_size: Tuple of (width, height) for the target size
 
     Returns:
-        Resized PIL Image object
+        Processed PIL Image object
     """
-    # Get current dimensions
-    width, height = img.size
-
-    # Calculate target width and height while maintaining aspect ratio
-    if width > height:
-        new_width = target_size[0]
-        new_height = int(height * (new_width / width))
-    else:
-        new_height = target_size[1]
-        new_width = int(width * (new_height / height))
-
-    # Resize the image
-    img_resized = img.resize((new_width, new_height), Image.LANCZOS)
+    # Ensure RGBA mode
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
 
-    # Create a new blank image with the target size
-    new_img = Image.new('RGBA', target_size, (0, 0, 0, 0))
+    # First crop to remove transparent borders, so the resize below only
+    # touches the visible content
+    img = crop_transparent(img)
 
-    # Paste the resized image in the center of the new image
-    paste_x = (target_size[0] - new_width) // 2
-    paste_y = (target_size[1] - new_height) // 2
-    new_img.paste(img_resized, (paste_x, paste_y), img_resized)
+    # Resize the content to fit a standard size square
+    width, height = img.size
+    scale = PROCESSED_ICON_SIZE / max(width, height)
+    new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    img = img.resize(new_size, Image.LANCZOS)
 
-    return new_img
+    # Center it on a transparent square with minimal padding, in one copy
+    padding = int(PROCESSED_ICON_SIZE * 0.05)
+    side = PROCESSED_ICON_SIZE + 2 * padding
+    padded = Image.new('RGBA', (side, side), (0, 0, 0, 0))
+    padded.paste(img, (padding + (PROCESSED_ICON_SIZE - new_size[0]) // 2,
+                       padding + (PROCESSED_ICON_SIZE - new_size[1]) // 2))
 
+    return padded
 
 def crop_transparent(img: Image.Image) -> Image.Image:
     """
@@ -156,11 +237,9 @@ def crop_transparent(img: Image.Image) -> Image.Image:
     Returns:
         Cropped PIL Image object
     """
-    # Get the alpha channel
-    alpha = img.getchannel('A')
-
-    # Get the bounding box of the non-transparent part
-    bbox = alpha.getbbox()
+    # Get the bounding box of the non-transparent part, scanning the alpha
+    # band in place rather than copying it out first
+    bbox = img.getbbox(alpha_only=True)
 
     # If there's no bbox, return the original image
     if not bbox:
@@ -170,33 +249,6 @@ def crop_transparent(img: Image.Image) -> Image.Image:
     return img.crop(bbox)
 
 
-def add_padding(img: Image.Image, padding_ratio: float = 0.1) -> Image.Image:
-    """
-    Add padding around an image.
-
-    Args:
-        img: PIL Image object
-        padding_ratio: Padding as a fraction of the image size
-
-    Returns:
-        Padded PIL Image object
-    """
-    # Calculate padding in pixels
-    width, height = img.size
-    padding_x = int(width * padding_ratio)
-    padding_y = int(height * padding_ratio)
-
-    # Create a new image with padding
-    new_width = width + 2 * padding_x
-    new_height = height + 2 * padding_y
-    new_img = Image.new('RGBA', (new_width, new_height), (0, 0, 0, 0))
-
-    # Paste the original image with padding
-    new_img.paste(img, (padding_x, padding_y), img)
-
-    return new_img
-
-
 def download_icon(url: str, output_path: str) -> bool:
     """
     Download an icon from a URL.
@@ -210,13 +262,13 @@ def download_icon(url: str, output_path: str) -> bool:
     """
     try:
         # Send a GET request to download the icon
-        response = requests.get(url, stream=True, timeout=10)
-        response.raise_for_status()
+        with requests.get(url, stream=True, timeout=10) as response:
+            response.raise_for_status()
 
-        # Save the icon to the output path
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            # Save the icon to the output path
+            with open(output_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
 
         return True
 
@@ -225,6 +277,17 @@ def download_icon(url: str, output_path: str) -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=16)
+def get_placeholder_font(font_size: int) -> ImageFont.ImageFont:
+    """Load the placeholder font once per size, falling back to Pillow's default."""
+    # Try to use a system font
+    try:
+        return ImageFont.truetype("Arial", font_size)
+    except OSError:
+        # If that fails, use the default font
+        return ImageFont.load_default()
+
+
 def create_placeholder_icon(output_path: str, text: str = '', size: Tuple[int, int] = (200, 200)) -> bool:
     """
     Create a placeholder icon with optional text.
@@ -242,7 +305,6 @@ def create_placeholder_icon(output_path: str, text: str = '', size: Tuple[int, i
         img = Image.new('RGBA', size, (200, 200, 200, 255))
 
         # Add some visual elements to make it look like a placeholder
-        from PIL import ImageDraw, ImageFont
         draw = ImageDraw.Draw(img)
 
         # Draw a border
@@ -255,14 +317,8 @@ def create_placeholder_icon(output_path: str, text: str = '', size: Tuple[int, i
 
         # Add text if provided
         if text:
-            # Try to use a system font
-            try:
-                # Use a reasonable default font size
-                font_size = size[0] // 10
-                font = ImageFont.truetype("Arial", font_size)
-            except:
-                # If that fails, use the default font
-                font = ImageFont.load_default()
+            # Use a reasonable default font size
+            font = get_placeholder_font(size[0] // 10)
 
             # Calculate text position (centered)
             text_bbox = draw.textbbox((0, 0), text, font=font)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Add parent directory to path for imports, once for the whole test session
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -1,26 +1,64 @@
 #!/usr/bin/env python3
 
+import argparse
+import io
+import multiprocessing
 import unittest
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 
-def run_tests():
-    """Run all tests in the tests directory."""
-    # Add parent directory to path for imports
-    sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+def iter_test_classes(suite):
+    """Group the tests of a suite by test class, as lists of test IDs."""
+    classes = {}
+    stack = [suite]
+    while stack:
+        test = stack.pop()
+        if isinstance(test, unittest.TestSuite):
+            stack.extend(reversed(list(test)))
+        else:
+            classes.setdefault(type(test), []).append(test.id())
+    return list(classes.values())
+
+
+def run_test_ids(test_ids):
+    """Run the given tests in this process, returning whether they passed and their output."""
+    suite = unittest.TestLoader().loadTestsFromNames(test_ids)
+    stream = io.StringIO()
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(suite)
+    return result.wasSuccessful(), stream.getvalue()
+
+
+def run_tests(workers=1):
+    """Run all tests in the tests directory, optionally spread over worker processes."""
+    # Add parent directory to path for imports, as tests/conftest.py does for pytest
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(tests_dir))
 
     # Discover and run tests
     test_loader = unittest.TestLoader()
-    test_suite = test_loader.discover('tests')
+    test_suite = test_loader.discover(tests_dir)
 
-    test_runner = unittest.TextTestRunner(verbosity=2)
-    result = test_runner.run(test_suite)
+    if workers > 1:
+        # Whole test classes go to the same worker so class fixtures are set
+        # up once; forked workers inherit the discovered import paths
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            results = list(pool.map(run_test_ids, iter_test_classes(test_suite)))
+        for _, output in results:
+            sys.stderr.write(output)
+        successful = all(passed for passed, _ in results)
+    else:
+        test_runner = unittest.TextTestRunner(verbosity=2)
+        successful = test_runner.run(test_suite).wasSuccessful()
 
     # Return non-zero exit code if tests failed
-    if not result.wasSuccessful():
+    if not successful:
         sys.exit(1)
 
 
 if __name__ == '__main__':
-    run_tests()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=run_tests.__doc__)
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='number of worker processes (default: 1, run in this process)')
+    run_tests(parser.parse_args().workers)
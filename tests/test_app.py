@@ -1,16 +1,14 @@
 #!/usr/bin/env python3
 
 import unittest
-import sys
 import os
 import tempfile
 import json
 import io
+import stat
 from unittest.mock import patch, MagicMock
 from PIL import Image
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import app
 
 
@@ -38,8 +36,12 @@ class TestApp(unittest.TestCase):
         # Patch the app paths to use our test directories
         self.original_icons_folder = app.ICONS_FOLDER
         self.original_exports_folder = app.EXPORTS_FOLDER
+        self.original_cache_folder = app.CACHE_FOLDER
+        self.original_exports_db_path = app.EXPORTS_DB_PATH
         app.ICONS_FOLDER = self.icons_dir
         app.EXPORTS_FOLDER = self.exports_dir
+        app.CACHE_FOLDER = os.path.join(self.test_dir, 'cache')
+        app.EXPORTS_DB_PATH = os.path.join(self.test_dir, 'exports.db')
 
         # Create some test icons
         self.create_test_icons()
@@ -49,6 +51,8 @@ class TestApp(unittest.TestCase):
         # Restore original app paths
         app.ICONS_FOLDER = self.original_icons_folder
         app.EXPORTS_FOLDER = self.original_exports_folder
+        app.CACHE_FOLDER = self.original_cache_folder
+        app.EXPORTS_DB_PATH = self.original_exports_db_path
 
         # Clean up temporary directory
         self.temp_dir.cleanup()
@@ -180,12 +184,68 @@ class TestApp(unittest.TestCase):
         data = json.loads(response.data)
         self.assertFalse(data['success'])
 
+    def test_preview_png_dir(self):
+        """Test previewing and deleting an export with its PNGs in a job directory."""
+        job_id = 'dir_job'
+        png_dir = os.path.join(self.exports_dir, job_id)
+        os.makedirs(png_dir)
+        for i in range(12):
+            Image.new('RGB', (10, 10), color='red').save(os.path.join(png_dir, f'{job_id}_card_{i}.png'))
+
+        with open(os.path.join(self.exports_dir, f'{job_id}.json'), 'w') as f:
+            json.dump({
+                'id': job_id,
+                'created_at': '2023-01-01T00:00:00',
+                'pdf_path': os.path.join(self.exports_dir, f'{job_id}.pdf'),
+                'png_dir': png_dir
+            }, f)
+
+        png_paths = app.get_job_png_paths(app.load_job_data(os.path.join(self.exports_dir, f'{job_id}.json')))
+        self.assertEqual([os.path.basename(p) for p in png_paths], [f'{job_id}_card_{i}.png' for i in range(12)])
+
+        response = self.app.get(f'/preview/{job_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'/exports/{job_id}/{job_id}_card_0.png'.encode(), response.data)
+
+        response = self.app.get(f'/exports/{job_id}/{job_id}_card_0.png')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+        response = self.app.post('/api/delete_export', data={'job_id': job_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(png_dir))
+
+    def test_generate_cards_api_validation(self):
+        """Test that /api/generate rejects bad parameters before scanning icons."""
+        base = {'icon_set': 'user:test_set', 'symbols_per_card': '3'}
+        bad_requests = [
+            {'n_cards': 'lots'},
+            {'n_cards': '-1'},
+            {'n_symbols': '0'},
+            {'symbols_per_card': '2'},
+            {'symbols_per_card': '100'},
+            {'icon_set': 'other:test_set'},
+            {'icon_set': 'user:..'},
+        ]
+
+        with patch('app.os.scandir') as mock_scandir:
+            for params in bad_requests:
+                response = self.app.post('/api/generate', data={**base, **params})
+                self.assertEqual(response.status_code, 400, params)
+                self.assertFalse(json.loads(response.data)['success'])
+            mock_scandir.assert_not_called()
+
+        # A well-formed request for a missing set is a 404
+        response = self.app.post('/api/generate', data={**base, 'icon_set': 'user:missing'})
+        self.assertEqual(response.status_code, 404)
+
     def test_upload_icons_api(self):
         """Test the /api/upload_icons endpoint."""
         # Create a test image
         img = Image.new('RGB', (100, 100), color='red')
         img_buffer = io.BytesIO()
         img.save(img_buffer, format='PNG')
+        img_data = img_buffer.getvalue()
         img_buffer.seek(0)
 
         # Test with valid parameters
@@ -206,9 +266,19 @@ class TestApp(unittest.TestCase):
         self.assertTrue(os.path.exists(set_dir))
         self.assertTrue(os.path.exists(os.path.join(set_dir, 'metadata.json')))
 
+        # Files written atomically are not left readable by their owner only
+        metadata_mode = stat.S_IMODE(os.stat(os.path.join(set_dir, 'metadata.json')).st_mode)
+        self.assertEqual(metadata_mode, app.FILE_MODE)
+
+        # The icon was moved into place and no staged uploads were left behind
+        with open(os.path.join(set_dir, 'icon.png'), 'rb') as f:
+            self.assertEqual(f.read(), img_data)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(set_dir, 'icon.png')).st_mode), app.FILE_MODE)
+        self.assertFalse([name for name in os.listdir(self.icons_dir) if name.startswith('.upload-')])
+
         # Test with missing set name
         response = self.app.post('/api/upload_icons', data={
-            'icons': (img_buffer, 'icon.png')
+            'icons': (io.BytesIO(img_data), 'icon.png')
         }, content_type='multipart/form-data')
 
         # Check response
@@ -241,6 +311,16 @@ class TestApp(unittest.TestCase):
         data = json.loads(response.data)
         self.assertFalse(data['success'])
 
+        # Test with IDs that would point at the icons or cache folders themselves
+        user_cache_dir = os.path.join(app.CACHE_FOLDER, 'user')
+        os.makedirs(user_cache_dir)
+        for icon_set in ('user:', 'user:..', 'user:../icons'):
+            with self.subTest(icon_set=icon_set):
+                response = self.app.post('/api/delete_icon_set', data={'icon_set': icon_set})
+                self.assertEqual(response.status_code, 400)
+        self.assertTrue(os.path.isdir(app.ICONS_FOLDER))
+        self.assertTrue(os.path.isdir(user_cache_dir))
+
     def test_delete_export_api(self):
         """Test the /api/delete_export endpoint."""
         # Create a test export
@@ -272,6 +352,101 @@ class TestApp(unittest.TestCase):
         data = json.loads(response.data)
         self.assertFalse(data['success'])
 
+    def test_delete_export_without_created_at(self):
+        """Test that exports missing their creation time can still be deleted."""
+        job_id, job_data = self.create_test_export()
+        del job_data['created_at']
+        with open(os.path.join(self.exports_dir, f'{job_id}.json'), 'w') as f:
+            json.dump(job_data, f)
+
+        # Such jobs are left out of the listing, as before
+        with app.app.test_request_context():
+            self.assertEqual(app.get_recent_exports(), [])
+
+        response = self.app.post('/api/delete_export', data={'job_id': job_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(job_data['pdf_path']))
+
+    def test_serve_export(self):
+        """Test serving an exported file with caching headers."""
+        job_id, _ = self.create_test_export()
+        response = self.app.get(f'/exports/{job_id}.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'dummy pdf data')
+        self.assertEqual(response.cache_control.max_age, app.EXPORT_MAX_AGE)
+        etag = response.headers['ETag']
+        response.close()
+
+        # Repeat downloads are answered with a 304
+        response = self.app.get(f'/exports/{job_id}.pdf', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Only PDFs and PNGs are served; job data and the index are not
+        with open(os.path.join(self.exports_dir, 'exports.db'), 'wb') as f:
+            f.write(b'SQLite format 3')
+        for filename in (f'{job_id}.json', 'exports.db', 'exports.db-wal'):
+            response = self.app.get(f'/exports/{filename}')
+            self.assertEqual(response.status_code, 404)
+
+        # The index itself lives outside the served folder
+        with app.app.test_request_context():
+            app.get_recent_exports()
+        self.assertTrue(os.path.exists(app.EXPORTS_DB_PATH))
+        self.assertNotEqual(os.path.dirname(app.EXPORTS_DB_PATH), app.EXPORTS_FOLDER)
+
+    def test_get_recent_exports(self):
+        """Test listing recent exports from the exports index."""
+        # Existing job files are picked up when the index is first created
+        job_id, _ = self.create_test_export()
+        with app.app.test_request_context():
+            exports = app.get_recent_exports()
+        self.assertEqual([export['id'] for export in exports], [job_id])
+        self.assertEqual(exports[0]['created_at'], '2023-01-01 00:00')
+        self.assertTrue(exports[0]['pdf_exists'])
+
+        # Deleting the export removes it from the index
+        self.app.post('/api/delete_export', data={'job_id': job_id})
+        with app.app.test_request_context():
+            self.assertEqual(app.get_recent_exports(), [])
+
+    def test_get_recent_exports_without_index(self):
+        """Test the directory scan used when the exports index is unavailable."""
+        job_id, _ = self.create_test_export()
+        with patch('app.connect_exports_db', side_effect=app.sqlite3.OperationalError('locked')):
+            with app.app.test_request_context():
+                exports = app.get_recent_exports()
+        self.assertEqual([export['id'] for export in exports], [job_id])
+
+    def test_job_data_cache_is_bounded(self):
+        """Test that only the most recently loaded job data is kept."""
+        json_paths = [os.path.join(self.exports_dir, f'job_{i}.json') for i in range(3)]
+        for i, json_path in enumerate(json_paths):
+            with open(json_path, 'w') as f:
+                json.dump({'id': f'job_{i}', 'created_at': '2023-01-01T00:00:00'}, f)
+
+        with patch('app.JOB_DATA_CACHE_SIZE', 2), patch.dict(app._job_data_cache, clear=True):
+            for json_path in json_paths:
+                app.load_job_data(json_path)
+            self.assertEqual(list(app._job_data_cache), json_paths[1:])
+
+            # Loading a cached export makes it the most recent one
+            app.load_job_data(json_paths[1])
+            self.assertEqual(list(app._job_data_cache), [json_paths[2], json_paths[1]])
+
+    def test_get_user_icon_sets(self):
+        """Test listing user icon sets, including the cached rescan."""
+        icon_sets = app.get_user_icon_sets()
+        self.assertEqual(len(icon_sets), 1)
+        self.assertEqual(icon_sets[0]['id'], 'user:test_set')
+        self.assertEqual(icon_sets[0]['name'], 'Test Icon Set')
+        self.assertEqual(icon_sets[0]['count'], 10)
+
+        # Adding an icon changes the directory, so the set is rescanned
+        img = Image.new('RGBA', (50, 50), color='red')
+        img.save(os.path.join(self.test_set_dir, 'icon_extra.png'))
+        icon_sets = app.get_user_icon_sets()
+        self.assertEqual(icon_sets[0]['count'], 11)
+
     def test_health_check(self):
         """Test the health check endpoint."""
         response = self.app.get('/health')
@@ -1,46 +1,53 @@
 #!/usr/bin/env python3
 
+import itertools
 import math
 import os
-import sys
 import tempfile
 import unittest
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 from PIL import Image
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import card_generator
 
 
 class TestCardGenerator(unittest.TestCase):
     """Test the card generator functions."""
 
-    def setUp(self):
-        """Set up test case with sample images."""
-        # Create a temporary directory for test output
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.test_output_dir = self.temp_dir.name
-
-        # Create test images for symbols
-        self.test_images = {}
-        for i in range(10):
-            # Create a simple colored image with a unique color
-            color = (25 * (i % 10), 25 * (i // 3), 255 - 25 * i, 255)
-            img = Image.new('RGBA', (50, 50), color=color)
-            self.test_images[i] = img
+    # Job IDs only need to be unique within a test run
+    job_ids = itertools.count()
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up sample images, cards and an output directory once per class."""
+        # Create test images for symbols, each a simple colored image with a
+        # unique color, filled in one buffer
+        colors = np.array([(25 * (i % 10), 25 * (i // 3), 255 - 25 * i, 255) for i in range(10)], dtype=np.uint8)
+        pixels = np.broadcast_to(colors[:, None, None, :], (10, 4, 4, 4)).copy()
+        cls.test_images = {i: Image.fromarray(pixels[i], 'RGBA') for i in range(10)}
 
         # Create some test cards (lists of symbol indices)
-        self.test_cards = [
+        cls.test_cards = [
             [0, 1, 2, 3],  # Card with 4 symbols
             [0, 4, 5, 6],  # Card with 4 symbols, sharing 1 with first card
             [1, 4, 7, 8],  # Card with 4 symbols, sharing 1 with each previous card
         ]
 
-    def tearDown(self):
+        # Create a temporary directory for test output, shared by all tests
+        cls.temp_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
         """Clean up temporary files."""
-        self.temp_dir.cleanup()
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        """Give each test its own output directory."""
+        self.test_output_dir = os.path.join(self.temp_dir.name, self._testMethodName)
+        os.makedirs(self.test_output_dir, exist_ok=True)
 
     def test_generate_circular_layout(self):
         """Test generating a circular layout."""
@@ -48,22 +55,15 @@ class TestCardGenerator(unittest.TestCase):
         for n_symbols in range(3, 10):
             layout = card_generator.generate_circular_layout(n_symbols)
 
-            # We should have the right number of positions
-            self.assertEqual(len(layout), n_symbols)
-
-            # Each position should be a tuple of (x, y, scale)
-            for pos in layout:
-                self.assertEqual(len(pos), 3)
-                x, y, scale = pos
+            # We should have the right number of positions, each a tuple of (x, y, scale)
+            positions = np.asarray(layout)
+            self.assertEqual(positions.shape, (n_symbols, 3))
 
-                # Coordinates should be in [0, 1] range
-                self.assertGreaterEqual(x, 0)
-                self.assertLessEqual(x, 1)
-                self.assertGreaterEqual(y, 0)
-                self.assertLessEqual(y, 1)
+            # Coordinates should be in [0, 1] range
+            self.assertTrue(np.all((positions[:, :2] >= 0) & (positions[:, :2] <= 1)))
 
-                # Scale should be positive
-                self.assertGreater(scale, 0)
+            # Scale should be positive
+            self.assertTrue(np.all(positions[:, 2] > 0))
 
         # Test predefined layouts for common symbol counts
         common_counts = [3, 4, 5, 6, 7, 8]
@@ -82,22 +82,15 @@ class TestCardGenerator(unittest.TestCase):
         for n_symbols in range(3, 10):
             layout = card_generator.generate_grid_layout(n_symbols)
 
-            # We should have the right number of positions
-            self.assertEqual(len(layout), n_symbols)
-
-            # Each position should be a tuple of (x, y, scale)
-            for pos in layout:
-                self.assertEqual(len(pos), 3)
-                x, y, scale = pos
+            # We should have the right number of positions, each a tuple of (x, y, scale)
+            positions = np.asarray(layout)
+            self.assertEqual(positions.shape, (n_symbols, 3))
 
-                # Coordinates should be in [0, 1] range
-                self.assertGreaterEqual(x, 0)
-                self.assertLessEqual(x, 1)
-                self.assertGreaterEqual(y, 0)
-                self.assertLessEqual(y, 1)
+            # Coordinates should be in [0, 1] range
+            self.assertTrue(np.all((positions[:, :2] >= 0) & (positions[:, :2] <= 1)))
 
-                # Scale should be positive
-                self.assertGreater(scale, 0)
+            # Scale should be positive
+            self.assertTrue(np.all(positions[:, 2] > 0))
 
         # Test specific grid properties
         for n_symbols in [4, 9, 16]:  # Perfect squares
@@ -146,6 +139,10 @@ class TestCardGenerator(unittest.TestCase):
         )
         self.assertEqual(card_img.size, (400, 400))
 
+        # Test with the size given as a list
+        card_img = card_generator.create_circular_card(self.test_cards[0], self.test_images, size=[200, 200])
+        self.assertEqual(card_img.size, (200, 200))
+
         # Test with grid layout
         card_img = card_generator.create_circular_card(
             self.test_cards[0],
@@ -244,12 +241,76 @@ class TestCardGenerator(unittest.TestCase):
         )
         self.assertEqual(card_img.size, (400, 400))
 
+    def test_place_symbols(self):
+        """Test that symbol placements are jittered reproducibly from a seed."""
+        symbols = self.test_cards[0]
+        placements = card_generator.place_symbols(symbols, 'circle', 'circle', seed=42)
+        self.assertEqual([p[0] for p in placements], symbols)
+        self.assertEqual(placements, card_generator.place_symbols(symbols, 'circle', 'circle', seed=42))
+
+        # Jitter stays within its bounds around the layout
+        layout = card_generator.generate_circular_layout(len(symbols))
+        for (symbol, x, y, scale, rotation), (layout_x, layout_y, layout_scale) in zip(placements, layout):
+            self.assertLessEqual(abs(x - layout_x), 0.02)
+            self.assertLessEqual(abs(y - layout_y), 0.02)
+            self.assertEqual(scale, layout_scale)
+            self.assertLessEqual(abs(rotation), 25)
+            self.assertEqual(rotation % card_generator.ROTATION_STEP, 0)
+
+        # Seeded cards render identically
+        card_a = card_generator.create_circular_card(symbols, self.test_images, size=(200, 200), seed=7)
+        card_b = card_generator.create_circular_card(symbols, self.test_images, size=(200, 200), seed=7)
+        self.assertEqual(card_a.tobytes(), card_b.tobytes())
+
+    def test_symbol_cache(self):
+        """Test that scaled and rotated symbols are reused across placements."""
+        symbol_cache = card_generator.SymbolCache(self.test_images)
+        self.assertIn(0, symbol_cache)
+        self.assertNotIn(99, symbol_cache)
+
+        # Each symbol is scaled once per size
+        scaled = symbol_cache.scaled(0, 40)
+        self.assertEqual(scaled.size, (40, 40))
+        self.assertIs(symbol_cache.scaled(0, 40), scaled)
+
+        # Rotations within the same bucket share an image
+        rotated = symbol_cache.get(0, 40, 11.0)
+        self.assertEqual(rotated.mode, 'RGBA')
+        self.assertIs(symbol_cache.get(0, 40, 9.0), rotated)
+        self.assertIsNot(symbol_cache.get(0, 40, 20.0), rotated)
+
+        # Rotated symbols grow to keep their corners
+        self.assertEqual(symbol_cache.get(0, 40, 0.0).size, (40, 40))
+        expected = math.ceil(40 * (math.cos(math.radians(10)) + math.sin(math.radians(10))))
+        self.assertAlmostEqual(rotated.width, expected, delta=1)
+
+    def test_render_pool(self):
+        """Test that one render pool is started and reused for every deck."""
+        render_pool = card_generator.get_render_pool()
+        self.assertIs(card_generator.get_render_pool(), render_pool)
+
+        # The PNGs of a deck are rendered on that pool
+        job_id = f"test-{next(self.job_ids)}-{self._testMethodName}"
+        with patch.object(render_pool, 'map', wraps=render_pool.map) as mock_map:
+            _, png_paths = card_generator.generate_cards(
+                job_id,
+                self.test_cards,
+                self.test_images,
+                self.test_output_dir,
+                export_png=True
+            )
+        mock_map.assert_called_once()
+        self.assertIs(card_generator.get_render_pool(), render_pool)
+        self.assertEqual(len(png_paths), len(self.test_cards))
+        for png_path in png_paths:
+            self.assertTrue(os.path.exists(png_path))
+
     def test_create_cards_pdf(self):
         """Test creating a PDF with multiple cards."""
         # Create a unique job ID for this test
-        job_id = f"test-{uuid.uuid4()}"
+        job_id = f"test-{next(self.job_ids)}-{self._testMethodName}"
 
-        # Create a PDF with the test cards
+        # Create a PDF with the test cards, end to end
         pdf_path = card_generator.create_cards_pdf(
             job_id,
             self.test_cards,
@@ -265,65 +326,48 @@ class TestCardGenerator(unittest.TestCase):
         # Check the PDF path format
         self.assertIn(job_id, pdf_path)
 
-        # Test with different card shapes and page layouts
-        pdf_path = card_generator.create_cards_pdf(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            card_shape='square',
-            card_size='A5',
-            layout='grid',
-            cards_per_page=2
-        )
+        variants = [
+            # Test with different card shapes and page layouts
+            dict(card_shape='square', card_size='A5', layout='grid', cards_per_page=2),
+            # Test with 4 and 9 cards per page
+            dict(cards_per_page=4),
+            dict(cards_per_page=9),
+            # Test an unsupported cards_per_page
+            dict(cards_per_page=7),
+            # Test with invalid card size (should default to A4)
+            dict(card_size='INVALID'),
+        ]
 
-        # Check that the PDF file exists
-        self.assertTrue(os.path.exists(pdf_path))
+        # The variants only need to draw their cards, so they draw onto mock
+        # canvases instead of writing files, one per output path
+        canvases = {}
 
-        # Test with 4 cards per page
-        pdf_path = card_generator.create_cards_pdf(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            cards_per_page=4
-        )
-        self.assertTrue(os.path.exists(pdf_path))
+        def mock_canvas(output_file, **kwargs):
+            canvases[output_file] = MagicMock()
+            return canvases[output_file]
 
-        # Test with 9 cards per page
-        pdf_path = card_generator.create_cards_pdf(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            cards_per_page=9
-        )
-        self.assertTrue(os.path.exists(pdf_path))
+        # Each variant draws its own PDF, so they can be built concurrently
+        with patch('card_generator.canvas.Canvas', side_effect=mock_canvas), ThreadPoolExecutor() as pool:
+            futures = []
+            for kwargs in variants:
+                # Create a unique job ID for each variant
+                job_id = f"test-{next(self.job_ids)}-{self._testMethodName}"
+                future = pool.submit(card_generator.create_cards_pdf, job_id, self.test_cards,
+                                     self.test_images, self.test_output_dir, **kwargs)
+                futures.append((job_id, kwargs, future))
 
-        # Test invalid cards_per_page (should default to 1)
-        pdf_path = card_generator.create_cards_pdf(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            cards_per_page=7  # Not a valid option
-        )
-        self.assertTrue(os.path.exists(pdf_path))
+            for job_id, kwargs, future in futures:
+                with self.subTest(**kwargs):
+                    pdf_path = future.result()
+                    self.assertIn(job_id, pdf_path)
 
-        # Test with invalid card size (should default to A4)
-        pdf_path = card_generator.create_cards_pdf(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            card_size='INVALID'
-        )
-        self.assertTrue(os.path.exists(pdf_path))
+                    # The PDF is saved once all cards are drawn
+                    canvases[pdf_path].save.assert_called_once_with()
 
     def test_generate_cards(self):
         """Test generating Dobble cards with PDF and PNG exports."""
         # Create a unique job ID for this test
-        job_id = f"test-{uuid.uuid4()}"
+        job_id = f"test-{next(self.job_ids)}-{self._testMethodName}"
 
         # Generate cards with both PDF and PNG exports
         pdf_path, png_paths = card_generator.generate_cards(
@@ -346,57 +390,38 @@ class TestCardGenerator(unittest.TestCase):
             self.assertTrue(png_path.endswith(".png"))
             self.assertIn(job_id, png_path)
 
-        # Test with square cards and no PNG export
-        pdf_path, png_paths = card_generator.generate_cards(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            card_shape='square',
-            export_png=False
-        )
-
-        # Check that the PDF file exists
-        self.assertTrue(os.path.exists(pdf_path))
-
-        # Check that no PNG files were generated
-        self.assertEqual(len(png_paths), 0)
-
-        # Test with different card size
-        pdf_path, png_paths = card_generator.generate_cards(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            card_size='A5'
-        )
-        self.assertTrue(os.path.exists(pdf_path))
-
-        # Test with grid layout
-        pdf_path, png_paths = card_generator.generate_cards(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            layout='grid'
-        )
-        self.assertTrue(os.path.exists(pdf_path))
-
-        # Test with custom cards_per_page
-        pdf_path, png_paths = card_generator.generate_cards(
-            job_id,
-            self.test_cards,
-            self.test_images,
-            self.test_output_dir,
-            cards_per_page=4
-        )
-        self.assertTrue(os.path.exists(pdf_path))
-
-        # Test with larger number of cards
-        many_cards = []
-        for i in range(10):
-            many_cards.append([i] + [j for j in range(10, 14)])
-
+        # The PNGs above do not depend on the page setup, so the remaining
+        # variants only build the PDF
+        variants = [
+            # Test with square cards
+            dict(card_shape='square'),
+            # Test with different card size
+            dict(card_size='A5'),
+            # Test with grid layout
+            dict(layout='grid'),
+            # Test with custom cards_per_page
+            dict(cards_per_page=9),
+        ]
+        for kwargs in variants:
+            with self.subTest(**kwargs):
+                job_id = f"test-{next(self.job_ids)}-{self._testMethodName}"
+                pdf_path, png_paths = card_generator.generate_cards(
+                    job_id,
+                    self.test_cards,
+                    self.test_images,
+                    self.test_output_dir,
+                    export_png=False,
+                    **kwargs
+                )
+
+                # Check that the PDF file exists and no PNG files were generated
+                self.assertTrue(os.path.exists(pdf_path))
+                self.assertEqual(len(png_paths), 0)
+
+        # Test with a larger number of cards, exporting both formats at once
+        many_cards = np.column_stack([np.arange(10), np.broadcast_to(np.arange(10, 14), (10, 4))]).tolist()
+
+        job_id = f"test-{next(self.job_ids)}-{self._testMethodName}"
         pdf_path, png_paths = card_generator.generate_cards(
             job_id,
             many_cards,
@@ -405,18 +430,7 @@ class TestCardGenerator(unittest.TestCase):
             cards_per_page=9
         )
         self.assertTrue(os.path.exists(pdf_path))
-        self.assertEqual(len(png_paths), 0)  # No PNGs by default
-
-        # Test with PNG export for many cards
-        pdf_path, png_paths = card_generator.generate_cards(
-            job_id,
-            many_cards,
-            self.test_images,
-            self.test_output_dir,
-            export_png=True
-        )
         self.assertEqual(len(png_paths), len(many_cards))
 
-
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,78 +1,58 @@
 #!/usr/bin/env python3
 
 import unittest
-import sys
-import os
 import math
 from collections import Counter
+from itertools import combinations
+
+import numpy as np
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import dobble_math
 
 
+def _build_sieve(n):
+    """Build a sieve of Eratosthenes, marking which numbers below n are prime."""
+    sieve = np.ones(n, dtype=bool)
+    sieve[:2] = False
+    for i in range(2, math.isqrt(n - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = False
+    return sieve
+
+
+# Reference primes for the prime tests, built once
+_SIEVE = _build_sieve(1000)
+
+
 class TestDobbleMath(unittest.TestCase):
     """Test the mathematical functions for Dobble card generation."""
 
+    def assertDobble(self, cards):
+        """Assert that any two cards share exactly one symbol, without comparing every pair."""
+        # No two symbols appear together on more than one card, so no two
+        # cards share more than one symbol...
+        symbol_pairs = Counter(pair for card in cards for pair in combinations(sorted(card), 2))
+        self.assertLessEqual(max(symbol_pairs.values(), default=0), 1)
+
+        # ...and every pair of cards is accounted for by some shared symbol
+        symbol_counts = Counter(symbol for card in cards for symbol in card)
+        shared_pairs = sum(k * (k - 1) // 2 for k in symbol_counts.values())
+        self.assertEqual(shared_pairs, len(cards) * (len(cards) - 1) // 2)
+
     def test_is_prime(self):
-        """Test the is_prime function."""
-        # Test some known primes
-        self.assertTrue(dobble_math.is_prime(2))
-        self.assertTrue(dobble_math.is_prime(3))
-        self.assertTrue(dobble_math.is_prime(5))
-        self.assertTrue(dobble_math.is_prime(7))
-        self.assertTrue(dobble_math.is_prime(11))
-        self.assertTrue(dobble_math.is_prime(13))
-        self.assertTrue(dobble_math.is_prime(17))
-        self.assertTrue(dobble_math.is_prime(19))
-        self.assertTrue(dobble_math.is_prime(23))
-        self.assertTrue(dobble_math.is_prime(29))
-        self.assertTrue(dobble_math.is_prime(31))
-
-        # Test some known non-primes
-        self.assertFalse(dobble_math.is_prime(1))
-        self.assertFalse(dobble_math.is_prime(4))
-        self.assertFalse(dobble_math.is_prime(6))
-        self.assertFalse(dobble_math.is_prime(8))
-        self.assertFalse(dobble_math.is_prime(9))
-        self.assertFalse(dobble_math.is_prime(10))
-        self.assertFalse(dobble_math.is_prime(12))
-        self.assertFalse(dobble_math.is_prime(14))
-        self.assertFalse(dobble_math.is_prime(15))
-        self.assertFalse(dobble_math.is_prime(16))
-        self.assertFalse(dobble_math.is_prime(18))
-        self.assertFalse(dobble_math.is_prime(20))
-        self.assertFalse(dobble_math.is_prime(21))
-
-        # Test edge cases
-        self.assertFalse(dobble_math.is_prime(0))
-        self.assertFalse(dobble_math.is_prime(-1))
-        self.assertFalse(dobble_math.is_prime(-2))
+        """Test the is_prime function against a sieve."""
+        # Cover both the small prime table and trial division, plus edge cases
+        numbers = range(-2, len(_SIEVE))
+        self.assertEqual([dobble_math.is_prime(k) for k in numbers],
+                         [k >= 0 and bool(_SIEVE[k]) for k in numbers])
 
     def test_next_prime(self):
-        """Test the next_prime function."""
-        # Test some known cases
-        self.assertEqual(dobble_math.next_prime(1), 2)
-        self.assertEqual(dobble_math.next_prime(2), 2)
-        self.assertEqual(dobble_math.next_prime(3), 3)
-        self.assertEqual(dobble_math.next_prime(4), 5)
-        self.assertEqual(dobble_math.next_prime(6), 7)
-        self.assertEqual(dobble_math.next_prime(8), 11)
-        self.assertEqual(dobble_math.next_prime(10), 11)
-        self.assertEqual(dobble_math.next_prime(12), 13)
-        self.assertEqual(dobble_math.next_prime(14), 17)
-        self.assertEqual(dobble_math.next_prime(16), 17)
-        self.assertEqual(dobble_math.next_prime(18), 19)
-        self.assertEqual(dobble_math.next_prime(20), 23)
-
-        # Test some larger numbers
-        self.assertEqual(dobble_math.next_prime(100), 101)
-        self.assertEqual(dobble_math.next_prime(101), 101)
-        self.assertEqual(dobble_math.next_prime(102), 103)
-
-        # Test edge cases
-        self.assertEqual(dobble_math.next_prime(0), 2)
-        self.assertEqual(dobble_math.next_prime(-5), 2)
+        """Test the next_prime function against a sieve."""
+        # The smallest prime >= k, for every k up to the largest prime in the sieve
+        primes = np.flatnonzero(_SIEVE)
+        numbers = range(-5, int(primes[-1]) + 1)
+        expected = primes[np.searchsorted(primes, [max(k, 2) for k in numbers])]
+        self.assertEqual([dobble_math.next_prime(k) for k in numbers], expected.tolist())
 
     def test_calculate_dobble_parameters(self):
         """Test the calculate_dobble_parameters function."""
@@ -111,11 +91,7 @@ class TestDobbleMath(unittest.TestCase):
         self.assertEqual(len(cards[0]), 3)  # n+1 = 2+1 = 3
 
         # Test that each pair of cards shares exactly one symbol
-        for i in range(len(cards)):
-            for j in range(i + 1, len(cards)):
-                intersection = cards[i].intersection(cards[j])
-                self.assertEqual(len(intersection), 1,
-                                 f"Cards {i} and {j} share {len(intersection)} symbols: {intersection}")
+        self.assertDobble(cards)
 
         # Test a larger projective plane of order 3
         cards = dobble_math.generate_projective_plane(3)
@@ -125,11 +101,7 @@ class TestDobbleMath(unittest.TestCase):
         self.assertEqual(len(cards[0]), 4)  # n+1 = 3+1 = 4
 
         # Test that each pair of cards shares exactly one symbol
-        for i in range(len(cards)):
-            for j in range(i + 1, len(cards)):
-                intersection = cards[i].intersection(cards[j])
-                self.assertEqual(len(intersection), 1,
-                                 f"Cards {i} and {j} share {len(intersection)} symbols: {intersection}")
+        self.assertDobble(cards)
 
         # Test that the function raises an error for non-prime orders
         with self.assertRaises(ValueError):
@@ -162,15 +134,17 @@ class TestDobbleMath(unittest.TestCase):
         self.assertGreaterEqual(total_symbols, 57)
         self.assertEqual(len(cards[0]), 8)  # n+1 where n=7
 
-        # Verify the Dobble property for a subset of cards
-        test_cards = cards[:20]  # Test with first 20 cards to keep test fast
-        for i in range(len(test_cards)):
-            for j in range(i + 1, len(test_cards)):
-                # Convert to sets for intersection
-                card1, card2 = set(test_cards[i]), set(test_cards[j])
-                intersection = card1.intersection(card2)
-                self.assertEqual(len(intersection), 1,
-                                 f"Cards {i} and {j} share {len(intersection)} symbols: {intersection}")
+        # Verify the Dobble property for the whole deck
+        self.assertDobble(cards)
+
+    def test_generate_dobble_cards_cached(self):
+        """Test that the cached deck is copied for each call."""
+        cards, _ = dobble_math.generate_dobble_cards(13, shuffle=False)
+        cards[0].clear()
+
+        cards, _ = dobble_math.generate_dobble_cards(13, shuffle=False)
+        self.assertEqual(len(cards[0]), 4)
+        self.assertTrue(dobble_math.verify_dobble_property(cards))
 
     def test_limit_cards(self):
         """Test the limit_cards function."""
@@ -183,12 +157,7 @@ class TestDobbleMath(unittest.TestCase):
         self.assertEqual(len(limited_cards), 10)
 
         # Verify that the Dobble property still holds
-        for i in range(len(limited_cards)):
-            for j in range(i + 1, len(limited_cards)):
-                card1, card2 = set(limited_cards[i]), set(limited_cards[j])
-                intersection = card1.intersection(card2)
-                self.assertEqual(len(intersection), 1,
-                                 f"Cards {i} and {j} share {len(intersection)} symbols: {intersection}")
+        self.assertDobble(limited_cards)
 
         # Test with a limit larger than the number of cards
         limited_cards = dobble_math.limit_cards(cards, original_count + 10)
@@ -197,24 +166,25 @@ class TestDobbleMath(unittest.TestCase):
     def test_select_symbols(self):
         """Test the select_symbols function."""
         # Generate a set of cards
-        cards, _ = dobble_math.generate_dobble_cards(13)
+        cards, total_symbols = dobble_math.generate_dobble_cards(13)
 
-        # Get all unique symbols used in the cards
+        # Every symbol on the cards is mapped
         all_symbols = set()
         for card in cards:
             all_symbols.update(card)
 
         # Test with enough images
-        symbol_to_image = dobble_math.select_symbols(cards, len(all_symbols))
-        self.assertEqual(len(symbol_to_image), len(all_symbols))
+        symbol_to_image = dobble_math.select_symbols(total_symbols, total_symbols + 5)
+        self.assertEqual(set(symbol_to_image), all_symbols)
 
         # Test with exact number of images
-        symbol_to_image = dobble_math.select_symbols(cards, len(all_symbols))
-        self.assertEqual(len(symbol_to_image), len(all_symbols))
+        symbol_to_image = dobble_math.select_symbols(total_symbols, total_symbols)
+        self.assertEqual(set(symbol_to_image), all_symbols)
+        self.assertEqual(len(set(symbol_to_image.values())), total_symbols)
 
         # Test with insufficient images
         with self.assertRaises(ValueError):
-            dobble_math.select_symbols(cards, len(all_symbols) - 1)
+            dobble_math.select_symbols(total_symbols, total_symbols - 1)
 
     def test_verify_dobble_property(self):
         """Test the verify_dobble_property function."""
@@ -225,17 +195,15 @@ class TestDobbleMath(unittest.TestCase):
         self.assertTrue(dobble_math.verify_dobble_property(cards))
 
         # Create an invalid set of cards (duplicate a card)
-        invalid_cards = cards.copy()
-        invalid_cards.append(invalid_cards[0])
+        invalid_cards = cards + [cards[0]]
 
         # This should raise an AssertionError
         with self.assertRaises(AssertionError):
             dobble_math.verify_dobble_property(invalid_cards)
 
-        # Create another invalid set where two cards share more than one symbol
-        invalid_cards = cards.copy()
-        # Modify the last card to share multiple symbols with the first card
-        invalid_cards[-1] = invalid_cards[0][:2] + invalid_cards[-1][2:]
+        # Create another invalid set where two cards share more than one symbol,
+        # replacing the last card with one sharing multiple symbols with the first
+        invalid_cards = cards[:-1] + [cards[0][:2] + cards[-1][2:]]
 
         # This should raise an AssertionError
         with self.assertRaises(AssertionError):